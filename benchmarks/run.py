@@ -0,0 +1,236 @@
+#!/usr/bin/python3
+# Benchmarks of the generator, the canonicalization, the classification stages and the round eliminator wrapper.
+# Every benchmark is run a few times and reports its best time, its throughput and the peak memory it allocated.
+# The results can be saved as a JSON baseline and compared with a previous baseline to catch regressions.
+import sys, getopt, json, os, io, platform, random, time, tracemalloc
+from contextlib import redirect_stdout
+from functools import partial
+from tlp_classifier.generator import generate
+from tlp_classifier.problem import Problem
+from tlp_classifier.tools import mask_to_constraint, configurations, reduce_masks
+from tlp_classifier.algorithms import constraint_reduction, run_server, round_eliminator_ub, round_eliminator_lb, get_spool
+from tlp_classifier.classifier import propagate, unsolvable_criteria, two_labels_classification, cover_map_problems, greedy_4_coloring_test
+from tlp_classifier.known_results import load_known_results
+from tlp_classifier.propagation import Propagator
+from tlp_classifier.complexity import Complexity
+
+BENCHMARKS_DIR = os.path.dirname(os.path.realpath(__file__))
+STUB_SERVER = os.path.join(os.path.dirname(BENCHMARKS_DIR),'tests','stub_server.py')
+
+# Return the default path of the baseline file
+def default_baseline_path():
+    return os.path.join(BENCHMARKS_DIR,'baselines','baseline.json')
+
+# Return the data set of the given degrees, generated once
+DATA_SETS = dict()
+def data_set(white_degree, black_degree):
+    if (white_degree,black_degree) not in DATA_SETS:
+        DATA_SETS[(white_degree,black_degree)] = generate(white_degree,black_degree)
+    return DATA_SETS[(white_degree,black_degree)]
+
+# Return the data set of the given degrees with its bounds reset, for the benchmarks that classify
+def fresh_data_set(white_degree, black_degree):
+    problems,relaxations,restrictions = data_set(white_degree,black_degree)
+    for problem in problems:
+        problem.lower_bound,problem.upper_bound = Complexity.Constant,Complexity.Unsolvable
+        problem.constant_lower_bound,problem.constant_upper_bound = 0,sys.maxsize
+    return (problems,relaxations,restrictions)
+
+# Return the given number of random pairs (white mask, black mask) of the given degrees
+def random_masks(white_degree, black_degree, number):
+    rng = random.Random(0)
+    return [(rng.getrandbits(len(configurations(white_degree))),rng.getrandbits(len(configurations(black_degree)))) for i in range(number)]
+
+# Each benchmark returns (function to time, number of items it processes)
+
+def bench_generate(white_degree, black_degree, jobs = 1):
+    return (lambda : generate(white_degree,black_degree,jobs),len(data_set(white_degree,black_degree)[0]))
+
+# Numbers of processes of the generation benchmarks of generate_jobs_<jobs>, to compare the times along the curve
+GENERATE_JOBS = sorted({1,2,4,os.cpu_count() or 1})
+
+def bench_characteristic_problem(white_degree, black_degree):
+    problems = [Problem.from_masks(w,b,white_degree,black_degree) for w,b in random_masks(white_degree,black_degree,5000)]
+    return (lambda : [problem.get_characteristic_problem() for problem in problems],len(problems))
+
+def bench_constraint_reduction(white_degree, black_degree):
+    constraints = [(mask_to_constraint(w,white_degree),mask_to_constraint(b,black_degree)) for w,b in random_masks(white_degree,black_degree,5000)]
+    return (lambda : [constraint_reduction(w,b) for w,b in constraints],len(constraints))
+
+def bench_reduce_masks(white_degree, black_degree):
+    masks = random_masks(white_degree,black_degree,5000)
+    return (lambda : [reduce_masks.__wrapped__(w,b,white_degree,black_degree) for w,b in masks],len(masks))
+
+def bench_propagate(white_degree, black_degree):
+    problems,relaxations,restrictions = data_set(white_degree,black_degree)
+    return (lambda : propagate(problems,restrictions,relaxations),len(problems))
+
+def bench_incremental_propagation(white_degree, black_degree):
+    problems,relaxations,restrictions = data_set(white_degree,black_degree)
+    def run():
+        problems,relaxations,restrictions = fresh_data_set(white_degree,black_degree)
+        propagator = Propagator(relaxations,restrictions)
+        for i,problem in enumerate(restrictions.order[::50]):
+            propagator.set_constant_upper_bound(problem,i % 5)
+    return (run,len(restrictions.order[::50]))
+
+def bench_stage(function, white_degree, black_degree):
+    def run():
+        problems,_,_ = fresh_data_set(white_degree,black_degree)
+        function(problems)
+    return (run,len(data_set(white_degree,black_degree)[0]))
+
+def bench_unsolvable(white_degree, black_degree):
+    return bench_stage(lambda problems : [unsolvable_criteria(problem) for problem in problems],white_degree,black_degree)
+
+def bench_two_labels(white_degree, black_degree):
+    return bench_stage(two_labels_classification,white_degree,black_degree)
+
+def bench_cover_map(white_degree, black_degree):
+    return bench_stage(lambda problems : cover_map_problems(problems,white_degree,black_degree),white_degree,black_degree)
+
+def bench_greedy_4_coloring(white_degree, black_degree):
+    return bench_stage(lambda problems : [greedy_4_coloring_test(problem) for problem in problems],white_degree,black_degree)
+
+def bench_known_results(white_degree, black_degree):
+    _,_,restrictions = data_set(white_degree,black_degree)
+    def run():
+        known_results = load_known_results()
+        for known,_ in known_results.entries(white_degree,black_degree):
+            problem = restrictions.get(known)
+            if problem is not None:
+                known_results.apply(problem)
+    return (run,len(load_known_results().entries(white_degree,black_degree)))
+
+def bench_round_eliminator(function, white_degree, black_degree):
+    problems = data_set(white_degree,black_degree)[2].order[-50:]
+    run = partial(run_server,server=STUB_SERVER)
+    def bench():
+        for problem in problems:
+            function(problem,10,3,run)
+    return (bench,len(problems))
+
+def bench_round_eliminator_ub(white_degree, black_degree):
+    return bench_round_eliminator(round_eliminator_ub,white_degree,black_degree)
+
+def bench_round_eliminator_lb(white_degree, black_degree):
+    return bench_round_eliminator(round_eliminator_lb,white_degree,black_degree)
+
+# The benchmarks as (name, function, degrees)
+BENCHMARKS = [
+    ("generate",bench_generate,[(2,2),(2,3)]),
+] + [
+    ("generate_jobs_" + str(jobs),partial(bench_generate,jobs=jobs),[(2,3)]) for jobs in GENERATE_JOBS
+] + [
+    ("characteristic_problem",bench_characteristic_problem,[(2,3),(3,3)]),
+    ("constraint_reduction",bench_constraint_reduction,[(2,3),(3,3)]),
+    ("reduce_masks",bench_reduce_masks,[(2,3),(3,3)]),
+    ("propagate",bench_propagate,[(2,3)]),
+    ("incremental_propagation",bench_incremental_propagation,[(2,3)]),
+    ("stage_unsolvable",bench_unsolvable,[(2,3)]),
+    ("stage_two_labels",bench_two_labels,[(2,3)]),
+    ("stage_cover_map",bench_cover_map,[(2,3)]),
+    ("stage_greedy_4_coloring",bench_greedy_4_coloring,[(2,3)]),
+    ("stage_known_results",bench_known_results,[(2,3)]),
+    ("round_eliminator_ub",bench_round_eliminator_ub,[(2,3)]),
+    ("round_eliminator_lb",bench_round_eliminator_lb,[(2,3)])
+]
+
+# Run the given benchmark and return its results (best time in seconds, throughput in items per second, peak memory in bytes).
+# The output of the benchmarked functions is discarded.
+def measure(function, items, repeat):
+    times = []
+    with redirect_stdout(io.StringIO()):
+        for i in range(repeat):
+            start = time.perf_counter()
+            function()
+            times.append(time.perf_counter() - start)
+        tracemalloc.start()
+        function()
+        _,peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    best = min(times)
+    return {"seconds" : best, "items" : items, "throughput" : items/best if best > 0 else None, "peak_memory" : peak}
+
+# Return the description of the machine and of the Python version the benchmarks run on, saved with the baseline
+def environment():
+    return {"python" : sys.version.split()[0], "implementation" : platform.python_implementation(), "platform" : platform.platform(),
+        "machine" : platform.machine(), "processor" : platform.processor(), "cpu_count" : os.cpu_count()}
+
+# Return the names of the benchmarks whose time exceeds the baseline by more than the given factor
+def regressions(results, baseline, factor):
+    return [name for name,result in results.items() if name in baseline and result["seconds"] > factor*baseline[name]["seconds"]]
+
+def main(argv):
+    baseline_path = default_baseline_path()
+    save = False
+    repeat = 3
+    selected = None
+    factor = 1.25
+    usage = 'run.py [-b <baseline file>] [-s] [-r <repeat>] [-k <benchmark name prefix>] [-f <regression factor>]'
+    try:
+        opts, args = getopt.getopt(argv,"hb:sr:k:f:",["baseline=","save","repeat=","keyword=","factor="])
+    except getopt.GetoptError:
+        print(usage)
+        sys.exit(2)
+    for opt, arg in opts:
+        if opt == '-h':
+            print(usage)
+            sys.exit()
+        elif opt in ("-b", "--baseline"):
+            baseline_path = arg
+        elif opt in ("-s", "--save"):
+            save = True
+        elif opt in ("-k", "--keyword"):
+            selected = arg
+        elif opt in ("-r", "--repeat"):
+            try :
+                repeat = int(arg)
+            except ValueError:
+                print("The number of repetitions is not an int")
+                sys.exit(1)
+        elif opt in ("-f", "--factor"):
+            try :
+                factor = float(arg)
+            except ValueError:
+                print("The regression factor is not a number")
+                sys.exit(1)
+
+    baseline = dict()
+    current = environment()
+    if os.path.exists(baseline_path):
+        with open(baseline_path) as baseline_file:
+            data = json.load(baseline_file)
+        baseline = data["results"]
+        # The times are only comparable with a baseline made on the same machine and Python version
+        if data.get("environment") != current:
+            print("Warning, the baseline was made on another environment (" + json.dumps(data.get("environment")) + "), run with -s to save a baseline of this one")
+
+    results = dict()
+    for name,benchmark,degrees in BENCHMARKS:
+        for white_degree,black_degree in degrees:
+            full_name = name + "_" + str(white_degree) + "_" + str(black_degree)
+            if selected is not None and not full_name.startswith(selected):
+                continue
+            with redirect_stdout(io.StringIO()):
+                function,items = benchmark(white_degree,black_degree)
+            results[full_name] = result = measure(function,items,repeat)
+            change = ""
+            if full_name in baseline:
+                change = "  (" + format(result["seconds"]/baseline[full_name]["seconds"],".2f") + "x baseline)"
+            print(format(full_name,"<40") + format(result["seconds"]*1000,">10.2f") + " ms" + format(result["throughput"] or 0,">14.0f") + " items/s" + format(result["peak_memory"]/1e6,">10.2f") + " MB" + change)
+    get_spool().cleanup()
+
+    slower = regressions(results,baseline,factor)
+    if slower:
+        print("Error, slower than the baseline by more than a factor " + str(factor) + " : " + ", ".join(slower))
+    if save:
+        os.makedirs(os.path.dirname(os.path.abspath(baseline_path)),exist_ok=True)
+        with open(baseline_path,"w") as baseline_file:
+            json.dump({"environment" : current, "results" : {**baseline,**results}},baseline_file,indent=4)
+        print("Baseline saved in " + baseline_path)
+    if slower:
+        sys.exit(1)
+
+if __name__ == "__main__":
+   main(sys.argv[1:])
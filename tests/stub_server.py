@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+# Stand-in for the round eliminator server used by the tests: answers autoub/autolb with the number of configurations
+# of the first constraint of the given problem file. STUB_SERVER_SLEEP delays the answer by the given number of seconds,
+# STUB_SERVER_SLEEP_WHITE only for the problem files with the white constraint first.
+import os, sys, time
+
+def main(argv):
+    function = argv[0]
+    path = argv[argv.index('-f')+1]
+    with open(path) as problem_file:
+        first_constraint = problem_file.read().split('\n\n')[0]
+    size = len([line for line in first_constraint.split('\n') if line.strip()])
+    time.sleep(float(os.environ.get('STUB_SERVER_SLEEP','0')))
+    if path.endswith('_w.txt'):
+        time.sleep(float(os.environ.get('STUB_SERVER_SLEEP_WHITE','0')))
+    if function == 'autoub':
+        print("Upper bound of " + str(size) + " rounds.")
+    elif function == 'autolb':
+        print("Lower bound of " + str(size-1) + " rounds.")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,28 @@
+import unittest
+import random
+
+from tlp_classifier.algorithms import cover_map_1, cover_map_masks, cover_map_applies, redundancy_algorithm, redundancy_masks
+from tlp_classifier.tools import mask_to_constraint, constraint_to_mask, configurations
+
+class TestAlgorithms(unittest.TestCase):
+    def test_cover_map_masks(self):
+        rng = random.Random(0)
+        for white_degree,black_degree in [(2,3),(4,6)]:
+            self.assertTrue(cover_map_applies(white_degree,black_degree))
+            white_masks = [rng.getrandbits(len(configurations(white_degree))) for i in range(500)]
+            black_masks = [rng.getrandbits(len(configurations(black_degree))) & rng.getrandbits(len(configurations(black_degree))) for i in range(500)]
+            expected = [cover_map_1(mask_to_constraint(w,white_degree),mask_to_constraint(b,black_degree)) for w,b in zip(white_masks,black_masks)]
+            self.assertEqual(cover_map_masks(white_masks,black_masks,white_degree,black_degree).tolist(), expected)
+        self.assertFalse(cover_map_applies(3,3))
+        self.assertFalse(cover_map_applies(2,4))
+
+    def test_redundancy_masks(self):
+        rng = random.Random(0)
+        for white_degree,black_degree in [(2,2),(2,3),(3,3)]:
+            for i in range(500):
+                white_mask = rng.getrandbits(len(configurations(white_degree)))
+                black_mask = rng.getrandbits(len(configurations(black_degree)))
+                expected = redundancy_algorithm(mask_to_constraint(white_mask,white_degree),mask_to_constraint(black_mask,black_degree))
+                if expected is not None:
+                    expected = (constraint_to_mask(expected[0],white_degree),constraint_to_mask(expected[1],black_degree),expected[2])
+                self.assertEqual(redundancy_masks(white_mask,black_mask,white_degree,black_degree), expected)
@@ -0,0 +1,39 @@
+import unittest
+import tempfile
+
+from tlp_classifier.generator import generate
+from tlp_classifier.problem_set import Problem_set
+from tlp_classifier.file_help import store
+from tlp_classifier.api import ProblemDatabase
+
+class TestApi(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.problems,cls.relaxations,cls.restrictions = generate(2,2)
+        store(2,2,(cls.problems,cls.relaxations,cls.restrictions),Problem_set.Classified,cls.directory.name)
+        cls.database = ProblemDatabase(2,2,path=cls.directory.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def test_queries(self):
+        problem = self.database.get_problem({'AB'},{'AA','BB'})
+        self.assertIn(problem, self.problems)
+        self.assertIs(self.database.get_problem({'BA'},{'BB','AA'}), problem)
+        self.assertEqual(self.database.get_relaxations_of({'AB'},{'AA','BB'}), self.relaxations[problem])
+        self.assertEqual(self.database.get_restrictions_of({'AB'},{'AA','BB'}), self.restrictions[problem])
+        self.assertEqual(self.database.get_restrictions_of({'AB'},{'AA','BB'},direct=True), self.restrictions.covers[problem])
+        self.assertIsNone(self.database.get_problem({'AAB'},{'AA'}))
+
+    def test_batch(self):
+        problems = self.database.get_problems([({'AB'},{'AA','BB'}),({'AA','BB'},{'AB'}),({'AB'},{'AAA'})])
+        self.assertIn(problems[0], self.problems)
+        self.assertIn(problems[1], self.problems)
+        self.assertIsNone(problems[2])
+
+    def test_indexes(self):
+        unclassified = self.database.get_unclassified_problems()
+        self.assertEqual(unclassified, self.problems)
+        self.assertEqual(self.database.get_UC_problems_with_C_relaxations(), {problem for problem in self.problems if not self.relaxations.covers[problem]})
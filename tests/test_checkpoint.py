@@ -0,0 +1,73 @@
+import unittest
+import os, sys, tempfile
+
+from tlp_classifier.generator import generate
+from tlp_classifier.classifier import classify, round_eliminator_ub
+from tlp_classifier.checkpoint import Checkpoint
+from tlp_classifier.propagation import bounds_of
+from tlp_classifier.complexity import Complexity
+
+# Executor answering the round eliminator calls without running the server, interrupted after the given number of results
+class FakeExecutor:
+    def __init__(self, interrupt_after = None):
+        self.interrupt_after = interrupt_after
+        self.calls = 0
+
+    def map(self, function, problems, iterations, labels):
+        problems = iter(sorted(problems, key=lambda x : (x.white_mask,x.black_mask)))
+        return self.schedule(function,lambda : next(problems,None),iterations,labels)
+
+    def schedule(self, function, next_problem, iterations, labels, record = None):
+        problem = next_problem()
+        while problem is not None:
+            if self.calls == self.interrupt_after:
+                raise KeyboardInterrupt
+            self.calls += 1
+            if record is not None:
+                record(problem,0.0,False)
+            if function == round_eliminator_ub:
+                yield (problem,(problem.white_mask+problem.black_mask) % 7 + iterations % 3 if problem.black_mask % 3 else -1)
+            else:
+                yield (problem,-1)
+            problem = next_problem()
+
+class TestCheckpoint(unittest.TestCase):
+    def test_resume(self):
+        problems,relaxations,restrictions = generate(2,2)
+        classify(problems,relaxations,restrictions,2,2,FakeExecutor())
+        expected = {(x.white_mask,x.black_mask) : bounds_of(x) for x in problems}
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory,'checkpoint.npz')
+            problems,relaxations,restrictions = generate(2,2)
+            checkpoint = Checkpoint(path,restrictions.order,interval=0)
+            with self.assertRaises(KeyboardInterrupt):
+                classify(problems,relaxations,restrictions,2,2,FakeExecutor(interrupt_after=5),checkpoint=checkpoint)
+            problems,relaxations,restrictions = generate(2,2)
+            checkpoint = Checkpoint(path,restrictions.order)
+            self.assertTrue(checkpoint.load())
+            self.assertIn("propagation", checkpoint.completed)
+            self.assertEqual(sum(map(len,checkpoint.handled.values())), 5)
+            executor = FakeExecutor()
+            classify(problems,relaxations,restrictions,2,2,executor,checkpoint=checkpoint)
+        self.assertEqual({(x.white_mask,x.black_mask) : bounds_of(x) for x in problems}, expected)
+
+    def test_resume_mid_propagation(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory,'checkpoint.npz')
+            problems,relaxations,restrictions = generate(2,2)
+            checkpoint = Checkpoint(path,restrictions.order,interval=0)
+            with self.assertRaises(KeyboardInterrupt):
+                classify(problems,relaxations,restrictions,2,2,FakeExecutor(interrupt_after=5),checkpoint=checkpoint)
+            # A bound saved before its propagation, as when the interruption comes in the middle of a propagation
+            problem = next(x for x in restrictions.order if relaxations.covers[x] and x.upper_bound == Complexity.Constant and 0 < x.constant_upper_bound < sys.maxsize)
+            problem.constant_upper_bound = 0
+            checkpoint.timeout("re_ub_",problem,2.5)
+            checkpoint.save()
+            problems,relaxations,restrictions = generate(2,2)
+            checkpoint = Checkpoint(path,restrictions.order)
+            self.assertTrue(checkpoint.load())
+            problem = restrictions.get(problem)
+            self.assertEqual(checkpoint.timeouts_of("re_ub_"), [(problem,2.5)])
+            classify(problems,relaxations,restrictions,2,2,FakeExecutor(),checkpoint=checkpoint)
+        for relax in relaxations.reachable(problem):
+            self.assertEqual(relax.constant_upper_bound, 0)
@@ -0,0 +1,137 @@
+import unittest
+import os, time, threading, signal, tempfile
+
+from tlp_classifier import alpha_to_problem
+from tlp_classifier.algorithms import round_eliminator_ub, round_eliminator_lb, get_upper_bound, get_lower_bound, get_spool
+from tlp_classifier.executor import RoundEliminatorExecutor
+from tlp_classifier.re_cache import RoundEliminatorCache
+from tlp_classifier.scheduling import EscalationPolicy
+from functools import partial
+
+STUB_SERVER = os.path.join(os.path.dirname(os.path.realpath(__file__)),'stub_server.py')
+
+PROBLEMS = [
+    alpha_to_problem({'AB','AC','BC'},{'AAA','BBB','CCC'}),
+    alpha_to_problem({'AA','BB','CC'},{'ABC'}),
+    alpha_to_problem({'AC','BC'},{'ABC','BCC'}),
+    alpha_to_problem({'AC','BC','AB'},{'ABC'}),
+]
+
+class TestExecutor(unittest.TestCase):
+    def tearDown(self):
+        os.environ.pop('STUB_SERVER_SLEEP',None)
+        os.environ.pop('STUB_SERVER_SLEEP_WHITE',None)
+
+    def test_results(self):
+        executor = RoundEliminatorExecutor(workers=3, server=STUB_SERVER)
+        upper_bounds = dict(executor.map(round_eliminator_ub,PROBLEMS,20,3))
+        lower_bounds = dict(executor.map(round_eliminator_lb,PROBLEMS,15,5))
+        for problem in PROBLEMS:
+            self.assertEqual(upper_bounds[problem], min(len(problem.white_constraint),len(problem.black_constraint)))
+            self.assertEqual(lower_bounds[problem], max(len(problem.white_constraint),len(problem.black_constraint))-1)
+        self.assertEqual(executor.calls, 4*len(PROBLEMS))
+        self.assertEqual(executor.timeouts, 0)
+
+    def test_parse_bounds(self):
+        output = "Upper bound of 12 rounds.\nUpper bound of 3 rounds.\nLower bound of 2 rounds.\nLower bound of 10 rounds.\n"
+        self.assertEqual(get_upper_bound(output), 3)
+        self.assertEqual(get_lower_bound(output), 10)
+        self.assertEqual(get_upper_bound("Upper bound of 12 rounds."), 12)
+        self.assertEqual(get_upper_bound("no bound"), -1)
+        self.assertEqual(get_lower_bound(""), -1)
+
+    def test_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = RoundEliminatorCache(os.path.join(directory,'cache.sqlite'), server=STUB_SERVER)
+            executor = RoundEliminatorExecutor(workers=2, server=STUB_SERVER, cache=cache)
+            first = dict(executor.map(round_eliminator_ub,PROBLEMS,20,3))
+            self.assertEqual((cache.hits,cache.misses,executor.calls), (0,len(PROBLEMS),2*len(PROBLEMS)))
+            cache.close()
+            cache = RoundEliminatorCache(os.path.join(directory,'cache.sqlite'), max_entries=2, server=STUB_SERVER)
+            executor = RoundEliminatorExecutor(workers=2, server=STUB_SERVER, cache=cache)
+            self.assertEqual(dict(executor.map(round_eliminator_ub,PROBLEMS,20,3)), first)
+            self.assertEqual((cache.hits,cache.misses,executor.calls), (len(PROBLEMS),0,0))
+            self.assertEqual(round_eliminator_ub(PROBLEMS[0],8,4,cache=cache,run=executor.run), first[PROBLEMS[0]])
+            self.assertLessEqual(cache.size(), 2)
+            cache.close()
+
+    def test_cache_bookkeeping(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory,'cache.sqlite')
+            cache = RoundEliminatorCache(path, max_entries=10, server=STUB_SERVER)
+            cache.put(PROBLEMS[0],'autoub',20,3,('b','w'))
+            cache.put(PROBLEMS[0],'autoub',20,3,('b','w'))
+            self.assertEqual(cache.size(), 1)
+            for iterations in range(12):
+                cache.put(PROBLEMS[1],'autoub',iterations,3,('b','w'))
+            count = cache._connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            self.assertEqual(cache.size(), count)
+            self.assertLessEqual(count, 10)
+            last_used = cache._connection.execute("SELECT MAX(last_used) FROM results").fetchone()[0]
+            self.assertEqual(cache.get(PROBLEMS[1],'autoub',11,3), ('b','w'))
+            cache.close()
+            # The use time of the hit is written on close
+            cache = RoundEliminatorCache(path, max_entries=10, server=STUB_SERVER)
+            self.assertGreater(cache._connection.execute("SELECT MAX(last_used) FROM results").fetchone()[0], last_used)
+            self.assertEqual(cache.size(), count)
+            cache.close()
+
+    def test_timeout(self):
+        os.environ['STUB_SERVER_SLEEP'] = '10'
+        executor = RoundEliminatorExecutor(workers=len(PROBLEMS), timeout=0.5, server=STUB_SERVER)
+        policy = EscalationPolicy([(8,4),(20,3)])
+        problems = iter(PROBLEMS)
+        start = time.time()
+        results = dict(executor.schedule(round_eliminator_ub,lambda : next(problems,None),20,3,partial(policy.record,(20,3))))
+        self.assertLess(time.time()-start, 5)
+        self.assertEqual(set(results.values()), {-1})
+        self.assertEqual(executor.timeouts, 2*len(PROBLEMS))
+        # The problems that timed out are run with the costlier settings after the others
+        self.assertEqual(policy.summary[(20,3)]["timeouts"], len(PROBLEMS))
+        self.assertTrue(all(policy.cost(problem) > 0 for problem in PROBLEMS))
+
+    def test_race(self):
+        os.environ['STUB_SERVER_SLEEP_WHITE'] = '10'
+        executor = RoundEliminatorExecutor(workers=2, server=STUB_SERVER)
+        # The black first run finds 3 rounds, the white first run cannot do better than the constant lower bound
+        problem = alpha_to_problem({'AB','AC','BC'},{'AAA','BBB','CCC'})
+        problem.constant_lower_bound = 3
+        start = time.time()
+        self.assertEqual(dict(executor.map(round_eliminator_ub,[problem],20,3)), {problem : 3})
+        self.assertLess(time.time()-start, 5)
+        self.assertEqual((executor.calls,executor.timeouts), (2,0))
+        self.assertEqual(executor._processes, set())
+        # The output of a decided race is not cached, it depends on the constant lower bound of this run
+        with tempfile.TemporaryDirectory() as directory:
+            cache = RoundEliminatorCache(os.path.join(directory,'cache.sqlite'), server=STUB_SERVER)
+            self.assertEqual(round_eliminator_ub(problem,20,3,run=executor.run,cache=cache), 3)
+            self.assertEqual(cache.size(), 0)
+            cache.close()
+
+    def test_cancel(self):
+        os.environ['STUB_SERVER_SLEEP'] = '10'
+        executor = RoundEliminatorExecutor(workers=2, server=STUB_SERVER)
+        results = executor.map(round_eliminator_ub,PROBLEMS,20,3)
+        start = time.time()
+        threading.Timer(0.5,os.kill,(os.getpid(),signal.SIGINT)).start()
+        with self.assertRaises(KeyboardInterrupt):
+            for problem,ub in results:
+                pass
+            raise AssertionError("the stub server should still be running")
+        self.assertLess(time.time()-start, 5)
+        self.assertEqual(executor._processes, set())
+
+    def test_cancel_while_starting(self):
+        os.environ['STUB_SERVER_SLEEP'] = '10'
+        executor = RoundEliminatorExecutor(server=STUB_SERVER)
+        # Race whose start cancels the executor, as a Ctrl-C between the start of a process and its registration
+        class CancellingRace:
+            stopped = False
+            def start(self, process):
+                executor.cancel()
+            def update(self, line):
+                pass
+        start = time.time()
+        self.assertEqual(executor.run(['autoub','-f',get_spool().path(PROBLEMS[0],True)],race=CancellingRace()), '')
+        self.assertLess(time.time()-start, 5)
+        self.assertEqual(executor._processes, set())
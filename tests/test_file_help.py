@@ -0,0 +1,40 @@
+import unittest
+import tempfile, os
+
+from tlp_classifier.generator import generate, generate_stream
+from tlp_classifier.complexity import Complexity
+from tlp_classifier.problem_set import Problem_set
+from tlp_classifier.file_help import store, import_data_set, load_data_set, store_stream, import_sqlite_data_set
+
+class TestFileHelp(unittest.TestCase):
+    def test_store_and_import(self):
+        problems,relaxations,restrictions = generate(2,2)
+        problem = restrictions.order[5]
+        problem.set_complexity(Complexity.Constant)
+        problem.constant_upper_bound = 3
+        with tempfile.TemporaryDirectory() as path:
+            store(2,2,(problems,relaxations,restrictions),Problem_set.Classified,path)
+            data_set = load_data_set(2,2,Problem_set.Classified,path)
+            self.assertEqual(len(data_set), len(problems))
+            self.assertEqual(data_set.problem(5).constant_upper_bound, 3)
+            self.assertEqual({data_set.problem(i) for i in data_set.restrictions_of(5)}, restrictions.covers[problem])
+            copy,copy_relaxations,copy_restrictions = import_data_set(2,2,Problem_set.Classified,path)
+        self.assertEqual(copy, problems)
+        self.assertEqual(copy_restrictions.order, restrictions.order)
+        for other in copy:
+            self.assertEqual(copy_relaxations.covers[other], relaxations.covers[other])
+            self.assertEqual(copy_restrictions.covers[other], restrictions.covers[other])
+        self.assertEqual(copy_restrictions.get(problem).get_complexity(), Complexity.Constant)
+
+    def test_stream_round_trip(self):
+        problems,relaxations,restrictions = generate(2,3)
+        for jobs in (1,2):
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory,'problems.sqlite')
+                self.assertEqual(store_stream(2,3,generate_stream(2,3,jobs),path,chunk_size=1000), len(problems))
+                copy,copy_relaxations,copy_restrictions = import_sqlite_data_set(2,3,Problem_set.Unclassified,path)
+            self.assertEqual(copy, problems)
+            self.assertEqual(copy_restrictions.order, restrictions.order)
+            for other in copy:
+                self.assertEqual(copy_relaxations.covers[other], relaxations.covers[other])
+                self.assertEqual(copy_restrictions.covers[other], restrictions.covers[other])
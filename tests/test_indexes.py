@@ -0,0 +1,37 @@
+import unittest
+import random
+
+from tlp_classifier.generator import generate
+from tlp_classifier.complexity import Complexity
+from tlp_classifier.propagation import Propagator
+from tlp_classifier.indexes import ProblemIndexes
+from tlp_classifier import api
+
+class TestIndexes(unittest.TestCase):
+    def test_indexes_follow_propagation(self):
+        problems,relaxations,restrictions = generate(2,2)
+        indexes = ProblemIndexes(problems,relaxations,restrictions)
+        propagator = Propagator(relaxations,restrictions,[indexes.update])
+        order = restrictions.order
+        rng = random.Random(1)
+        for step in range(40):
+            problem = rng.choice(order)
+            if problem.get_complexity() != Complexity.Unclassified:
+                continue
+            if step % 3 == 0:
+                propagator.set_constant_upper_bound(problem,rng.randint(1,5))
+            elif step % 3 == 1:
+                propagator.set_lower_bound(problem,Complexity.Logarithmic)
+            else:
+                propagator.set_complexity(problem,Complexity.Global)
+            if step % 5 == 0:
+                self.check(indexes,problems,relaxations,restrictions)
+        self.check(indexes,problems,relaxations,restrictions)
+
+    def check(self, indexes, problems, relaxations, restrictions):
+        for complexity in Complexity:
+            self.assertEqual(indexes.problems_of_complexity(complexity), api.get_problems_of_complexity(complexity,problems,relaxations,restrictions))
+        self.assertEqual(indexes.upper_bounds_constant_problems(), api.get_upper_bounds_constant_problems(problems))
+        self.assertEqual(indexes.constant_problems_with_upper_bound(2), api.get_constant_problems_with_x_rounds_UB(2,problems))
+        self.assertEqual(indexes.frontier_relaxations, api.get_UC_problems_with_C_relaxations(problems,relaxations,restrictions))
+        self.assertEqual(indexes.frontier_restrictions, api.get_UC_with_C_restrictions(problems,relaxations,restrictions))
@@ -0,0 +1,25 @@
+import unittest
+import os, json, tempfile
+
+from tlp_classifier import alpha_to_problem
+from tlp_classifier.complexity import Complexity
+from tlp_classifier.known_results import load_known_results
+
+class TestKnownResults(unittest.TestCase):
+    def test_input_tables(self):
+        registry = load_known_results()
+        # 3 vertex coloring, given with its labels permuted
+        problem = alpha_to_problem({'BA','BC','AC'},{'BBB','AAA','CCC'})
+        self.assertEqual(registry.lookup(problem), [("tight",Complexity.Logarithmic)])
+        registry.apply(problem)
+        self.assertEqual(problem.get_complexity(), Complexity.Logarithmic)
+        self.assertEqual(registry.lookup(alpha_to_problem({'AB'},{'AAB'})), [])
+
+    def test_data_file(self):
+        with tempfile.TemporaryDirectory() as path:
+            with open(os.path.join(path,'results_3_3.json'),'w') as results_file:
+                json.dump([{"white constraint": "AAA, BBC", "black constraint": "ABC", "bound": "lower bound", "complexity": "global"}],results_file)
+            registry = load_known_results(path)
+        problem = alpha_to_problem({'AAA','BBC'},{'ABC'})
+        self.assertEqual(registry.lookup(problem), [("lower bound",Complexity.Global)])
+        self.assertEqual(len(registry.entries(3,3)), 1)
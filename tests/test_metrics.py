@@ -0,0 +1,48 @@
+import unittest
+import os, json, tempfile
+
+from tlp_classifier.generator import generate
+from tlp_classifier.classifier import classify
+from tlp_classifier.complexity import Complexity
+from tlp_classifier.algorithms import round_eliminator_ub
+from tlp_classifier.executor import RoundEliminatorExecutor
+from tlp_classifier.metrics import Metrics
+from tests.test_checkpoint import FakeExecutor
+
+STUB_SERVER = os.path.join(os.path.dirname(os.path.realpath(__file__)),'stub_server.py')
+
+class TestMetrics(unittest.TestCase):
+    def test_classify(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory,'metrics.jsonl')
+            metrics = Metrics(path,os.path.join(directory,'profile'))
+            problems,relaxations,restrictions = generate(2,2,metrics=metrics)
+            classify(problems,relaxations,restrictions,2,2,FakeExecutor(),metrics=metrics)
+            executor = RoundEliminatorExecutor(workers=2,server=STUB_SERVER,metrics=metrics)
+            list(executor.map(round_eliminator_ub,restrictions.order[-3:],20,3))
+            metrics.close()
+            with open(path) as metrics_file:
+                records = [json.loads(line) for line in metrics_file]
+            self.assertTrue(os.path.exists(os.path.join(directory,'profile','two_labels.prof')))
+        stages = {record["stage"] : record for record in records[:-1]}
+        summary = records[-1]
+        self.assertEqual(list(stages)[:4], ["enumeration","relations","unsolvable","two_labels"])
+        self.assertEqual(stages["enumeration"]["counters"]["problems"], len(problems))
+        self.assertEqual(stages["re_ub_0"]["parameters"], {"iterations" : 20, "labels" : 3})
+        for record in stages.values():
+            self.assertGreaterEqual(record["wall_time"], 0)
+            self.assertGreaterEqual(record["cpu_time"], 0)
+            self.assertIn("rss_increase", record)
+            self.assertLessEqual(record["rss_increase"] or 0, record["process_peak_rss"] or 0)
+        # Every problem classified during the run is counted by exactly one stage
+        unclassified = sum(1 for problem in problems if problem.get_complexity() == Complexity.Unclassified)
+        self.assertEqual(sum(record["counters"].get("classified",0) for record in stages.values()), len(problems) - unclassified)
+        self.assertGreater(stages["re_ub_0"]["counters"]["candidates"], 0)
+        # The breakdown per complexity adds up to the problems classified by every stage
+        for stage,counts in summary["classified"].items():
+            self.assertEqual(sum(counts.values()), stages[stage]["counters"]["classified"])
+        self.assertEqual(summary["classified"]["unsolvable"], {"unsolvable" : sum(1 for problem in problems if problem.get_complexity() == Complexity.Unsolvable)})
+        calls = summary["round_eliminator"]["autoub"]
+        self.assertEqual(calls["calls"], 6)
+        self.assertEqual(calls["timeouts"], 0)
+        self.assertEqual(sum(calls["histogram"]), 6)
@@ -0,0 +1,87 @@
+import unittest
+import os, json, pickle
+
+from tlp_classifier import Problem, alpha_to_problem
+from tlp_classifier.generator import generate
+from tlp_classifier.complexity import Complexity, complexity_name
+from tlp_classifier.tools import alpha_to_num_constraint, constraint_to_mask, mask_to_constraint, configurations, reduce_masks
+from tlp_classifier.algorithms import constraint_reduction
+
+class TestProblem(unittest.TestCase):
+    def test_mask_round_trip(self):
+        for degree in range(2,5):
+            for mask in range(1 << len(configurations(degree))):
+                self.assertEqual(constraint_to_mask(mask_to_constraint(mask,degree),degree), mask)
+
+    def test_mask_reduction(self):
+        for white_degree,black_degree in [(2,2),(2,3)]:
+            for white_mask in range(1 << len(configurations(white_degree))):
+                for black_mask in range(0,1 << len(configurations(black_degree)),7):
+                    white,black = constraint_reduction(mask_to_constraint(white_mask,white_degree),mask_to_constraint(black_mask,black_degree))
+                    self.assertEqual(reduce_masks(white_mask,black_mask,white_degree,black_degree), (constraint_to_mask(white,white_degree),constraint_to_mask(black,black_degree)))
+
+    def test_constraints(self):
+        problem = Problem(alpha_to_num_constraint({'AB','AC','BC'}),alpha_to_num_constraint({'AAA','BBB','CCC'}),2,3)
+        self.assertEqual(problem.white_constraint, frozenset(alpha_to_num_constraint({'AB','AC','BC'})))
+        self.assertEqual(problem.black_constraint, frozenset(alpha_to_num_constraint({'AAA','BBB','CCC'})))
+        self.assertEqual(problem.alphabet(), {0,1,2})
+        # Label C only appears in the white constraint and is removed
+        problem = Problem(alpha_to_num_constraint({'AB','CC'}),alpha_to_num_constraint({'AAB','ABB'}),2,3)
+        self.assertEqual(problem.white_constraint, frozenset(alpha_to_num_constraint({'AB'})))
+
+    def test_output_order(self):
+        # The configurations are written in the order of configurations(degree), whatever the order of the input
+        problem = alpha_to_problem({'BC','AB','AC'},{'CCC','BBB','AAA'})
+        self.assertEqual(problem.to_tuple()["white constraint"], "BC, AC, AB")
+        self.assertEqual(problem.to_tuple()["black constraint"], "CCC, BBB, AAA")
+        self.assertEqual(problem.re_format()[0], "B C \nA C \nA B \n")
+
+    def test_output_file(self):
+        # The tracked output of the (2,3) classification is written by to_tuple
+        path = os.path.join(os.path.dirname(os.path.realpath(__file__)),'..','tlp_classifier','output','2_3.json')
+        with open(path) as output_file:
+            output = json.load(output_file)
+        problems,relaxations,restrictions = generate(2,3)
+        by_constraints = {(problem.white_constraint,problem.black_constraint) : problem for problem in problems}
+        complexities = {name : complexity for complexity,name in complexity_name.items()}
+        constraint = lambda text : frozenset(alpha_to_num_constraint(text.split(", ") if text else []))
+        for name,entries in output.items():
+            for entry in entries:
+                problem = by_constraints[(constraint(entry["white constraint"]),constraint(entry["black constraint"]))]
+                if complexities[name] == Complexity.Unclassified:
+                    problem.lower_bound = complexities[entry["complexity lower bound"]]
+                    problem.upper_bound = complexities[entry["complexity upper bound"]]
+                else:
+                    problem.set_complexity(complexities[name])
+                    if complexities[name] == Complexity.Constant:
+                        problem.constant_lower_bound = entry["complexity lower bound"]
+                        problem.constant_upper_bound = entry["complexity upper bound"]
+                self.assertEqual(problem.to_tuple(), entry)
+
+    def test_restriction(self):
+        restriction = Problem(alpha_to_num_constraint({'AB','AC','BC'}),alpha_to_num_constraint({'AAA','BBB','CCC'}),2,3)
+        relaxation = Problem(alpha_to_num_constraint({'AB','AC','BC'}),alpha_to_num_constraint({'AAA','BBB','CCC','ABC'}),2,3)
+        self.assertTrue(restriction.is_restriction(relaxation))
+        self.assertTrue(relaxation.is_relaxation(restriction))
+        self.assertFalse(relaxation.is_restriction(restriction))
+
+    def test_hash_and_pickle(self):
+        problem = alpha_to_problem({'AB','AC','BC'},{'AAA','BBB','CCC'})
+        same = alpha_to_problem({'BC','AB','AC'},{'CCC','BBB','AAA'})
+        self.assertEqual(problem, same)
+        self.assertEqual(len({problem, same}), 1)
+        copy = pickle.loads(pickle.dumps(problem))
+        self.assertEqual(copy, problem)
+        self.assertEqual(hash(copy), hash(problem))
+
+    def test_characteristic_problem(self):
+        for white_degree,black_degree in [(2,2),(2,3),(3,3)]:
+            white_configurations,black_configurations = configurations(white_degree),configurations(black_degree)
+            for i in range(200):
+                white = [c for j,c in enumerate(white_configurations) if (i*7+j) % 3 == 0]
+                black = [c for j,c in enumerate(black_configurations) if (i+j*j) % 4 < 2]
+                problem = Problem(white,black,white_degree,black_degree)
+                characteristic = problem.get_characteristic_problem()
+                self.assertTrue(characteristic.is_characteristic_problem())
+                for equivalent in problem.equivalent_problems_instance():
+                    self.assertEqual(equivalent.get_characteristic_problem(), characteristic)
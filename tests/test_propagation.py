@@ -0,0 +1,22 @@
+import unittest
+import sys
+
+from tlp_classifier.generator import generate
+from tlp_classifier.complexity import Complexity
+from tlp_classifier.classifier import propagate
+from tlp_classifier.propagation import Propagator, bounds_of
+
+class TestPropagation(unittest.TestCase):
+    def test_matches_full_propagation(self):
+        problems,relaxations,restrictions = generate(2,2)
+        order = restrictions.order
+        propagator = Propagator(relaxations,restrictions)
+        for i,problem in enumerate(order[::7]):
+            if i % 2:
+                propagator.set_constant_upper_bound(problem,i)
+            else:
+                propagator.set_lower_bound(problem,Complexity.Logarithmic)
+        bounds = {problem : bounds_of(problem) for problem in problems}
+        propagate(problems,restrictions,relaxations)
+        self.assertEqual({problem : bounds_of(problem) for problem in problems}, bounds)
+        self.assertTrue(any(problem.constant_upper_bound != sys.maxsize for problem in problems))
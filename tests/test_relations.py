@@ -0,0 +1,33 @@
+import unittest
+
+from tlp_classifier.generator import generate
+
+class TestRelations(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.problems,cls.relaxations,cls.restrictions = generate(2,2)
+
+    def test_relations_match_definition(self):
+        for problem in self.problems:
+            equivalents = problem.equivalent_problems_instance()
+            relaxations = {other for other in self.problems if other != problem and any(x.is_restriction(other) for x in equivalents)}
+            restrictions = {other for other in self.problems if other != problem and any(x.is_relaxation(other) for x in equivalents)}
+            self.assertEqual(self.relaxations[problem], relaxations)
+            self.assertEqual(self.restrictions[problem], restrictions)
+            self.assertEqual(set(self.relaxations.reachable(problem)), relaxations)
+
+    def test_hasse_diagram(self):
+        for problem in self.problems:
+            covers = self.relaxations.covers[problem]
+            for other in covers:
+                self.assertFalse(any(other in self.relaxations[x] for x in covers))
+                self.assertIn(problem, self.restrictions.covers[other])
+
+    def test_parallel_generation(self):
+        problems,relaxations,restrictions = generate(2,3)
+        parallel = generate(2,3,jobs=3)
+        self.assertEqual(parallel[0], problems)
+        for relation,expected in zip(parallel[1:],(relaxations,restrictions)):
+            self.assertEqual([(x.white_mask,x.black_mask) for x in relation.order], [(x.white_mask,x.black_mask) for x in expected.order])
+            # The closures of the relations follow from their covers
+            self.assertEqual(relation.covers, expected.covers)
@@ -0,0 +1,96 @@
+import unittest
+
+from tlp_classifier.generator import generate
+from tlp_classifier.classifier import classify, round_eliminator_ub
+from tlp_classifier.scheduling import ImplicationScheduler, EscalationPolicy
+
+# Executor whose upper bounds decrease along the relaxations, as the ones of the round eliminator. With drain, every
+# pending problem is taken before the first answer, as a pass without scheduling would.
+class MonotoneExecutor:
+    def __init__(self, drain = False):
+        self.drain = drain
+        self.calls = 0
+
+    def schedule(self, function, next_problem, iterations, labels, record = None):
+        queued = []
+        problem = next_problem()
+        while problem is not None:
+            queued.append(problem)
+            if not self.drain:
+                yield from self.answer(function,queued.pop(),record)
+            problem = next_problem()
+        for problem in queued:
+            yield from self.answer(function,problem,record)
+
+    def answer(self, function, problem, record):
+        self.calls += 1
+        if record is not None:
+            record(problem,0.0,False)
+        if function == round_eliminator_ub:
+            yield (problem,max(0,14 - bin(problem.white_mask).count("1") - bin(problem.black_mask).count("1")))
+        else:
+            yield (problem,-1)
+
+class TestScheduling(unittest.TestCase):
+    def test_implication_order(self):
+        problems,relaxations,restrictions = generate(2,2)
+        resolved = set()
+        scheduler = ImplicationScheduler(relaxations,problems,lambda x : x not in resolved)
+        queried = []
+        problem = scheduler.next()
+        first = problem
+        while problem is not None:
+            queried.append(problem)
+            # Every answer resolves the problem and its relaxations
+            for other in [problem] + list(relaxations.reachable(problem)):
+                if other not in resolved:
+                    resolved.add(other)
+                    scheduler.update(other)
+            problem = scheduler.next()
+        self.assertEqual(max(len(relaxations[x]) for x in problems), len(relaxations[first]))
+        self.assertEqual(len(queried) + len(scheduler.dropped), len(problems))
+        self.assertEqual(set(queried), {x for x in problems if not restrictions.covers[x]})
+
+    def test_costly_problems_last(self):
+        problems,relaxations,restrictions = generate(2,2)
+        policy = EscalationPolicy([(20,3),(8,4)])
+        slow = relaxations.order[-1]
+        policy.record((20,3),slow,10.0,True)
+        scheduler = ImplicationScheduler(relaxations,problems,lambda x : True,cost=policy.cost)
+        queried = []
+        problem = scheduler.next()
+        while problem is not None:
+            queried.append(problem)
+            problem = scheduler.next()
+        self.assertEqual(len(queried), len(problems))
+        self.assertEqual(queried[-1], slow)
+
+    def test_scheduled_calls(self):
+        results = []
+        calls = []
+        for drain in [False,True]:
+            problems,relaxations,restrictions = generate(2,3)
+            executor = MonotoneExecutor(drain)
+            classify(problems,relaxations,restrictions,2,3,executor)
+            results.append({(x.white_mask,x.black_mask) : x for x in problems})
+            calls.append(executor.calls)
+        # The candidates that got a bound from the answers are not queried, they keep the complexity and the bounds
+        # they inherited, which are at least the ones of their own answers
+        self.assertLess(calls[0], calls[1])
+        for masks,problem in results[0].items():
+            other = results[1][masks]
+            self.assertEqual(problem.get_complexity(), other.get_complexity())
+            self.assertGreaterEqual(problem.constant_upper_bound, other.constant_upper_bound)
+
+    def test_escalation_policy(self):
+        policy = EscalationPolicy([(20,3),(9,4),(8,4),(15,3)],budget=0)
+        self.assertEqual(policy.settings, [(15,3),(20,3),(8,4),(9,4)])
+        policy.start((15,3),10)
+        self.assertTrue(policy.out_of_budget())
+        policy.record((15,3),"problem",1.5,False)
+        policy.resolved((15,3),4)
+        policy.record((20,3),"slow",3.0,True)
+        self.assertEqual(policy.cost("problem"), 0)
+        self.assertEqual(policy.cost("slow"), 3.0)
+        self.assertEqual(policy.summary[(15,3)], {"candidates" : 10, "calls" : 1, "timeouts" : 0, "time" : 1.5, "resolved" : 4})
+        self.assertFalse(EscalationPolicy([(15,5)]).out_of_budget())
@@ -1,6 +1,6 @@
 import unittest
 
-from tlp_classifier import Complexity, get_complexity_of
+from tlp_classifier import Complexity, get_complexity_of, get_complexities
 from bitarray import bitarray
 from random import *
 import numpy as np
@@ -59,3 +59,11 @@ class TestClassification(unittest.TestCase):
         for x in problems:
             self.assertEqual(complexity(x), Complexity.Logarithmic)
             self.assertEqual(complexity(x[::-1]), Complexity.Logarithmic)
+
+    def test_batch_matches(self):
+        for white_degree in range(2,6):
+            for black_degree in range(2,6):
+                white = np.repeat(np.arange(1 << white_degree+1),1 << black_degree+1)
+                black = np.tile(np.arange(1 << black_degree+1),1 << white_degree+1)
+                expected = [get_complexity_of(bitarray(format(w,'0'+str(white_degree+1)+'b')[::-1]),bitarray(format(b,'0'+str(black_degree+1)+'b')[::-1])).value for w,b in zip(white,black)]
+                self.assertEqual(get_complexities(white,black,white_degree,black_degree).tolist(), expected)
@@ -1,21 +1,73 @@
-import sys, getopt
+import sys, getopt, json
 from .problem_set import Problem_set
-from .file_help import import_data_set
+from .file_help import import_data_set, store
 from .classifier import classify
+from .complexity import Complexity, complexity_name
+from .executor import RoundEliminatorExecutor
+from .re_cache import RoundEliminatorCache
+from .checkpoint import Checkpoint, default_checkpoint_path
+from .metrics import Metrics
 
 def main(argv):
     white_degree = -1
     black_degree = -1
     s = False
+    re_workers = 1
+    re_timeout = None
+    re_budget = None
+    re_cache = None
+    use_re_cache = True
+    resume = False
+    checkpoint_path = None
+    checkpoint_interval = 60.0
+    metrics_path = None
+    profile_dir = None
+    usage = 'classifier.py -w <whitedegree> -b <blackdegree> [-p <re workers>] [-t <re timeout in seconds>] [--re-budget <seconds per pass>] [-c <re cache file> | --no-re-cache] [-r] [--checkpoint <file>] [--checkpoint-interval <seconds>] [--metrics <file>] [--profile <directory>]'
     try:
-        opts, args = getopt.getopt(argv,"hw:b:",["wdegree=","bdegree="])
+        opts, args = getopt.getopt(argv,"hw:b:p:t:c:r",["wdegree=","bdegree=","re-workers=","re-timeout=","re-budget=","re-cache=","no-re-cache","resume","checkpoint=","checkpoint-interval=","metrics=","profile="])
     except getopt.GetoptError:
-        print ('classifier.py -w <whitedegree> -b <blackdegree>')
+        print (usage)
         sys.exit(2)
     for opt, arg in opts:
         if opt == '-h':
-            print('classifier.py -w <whitedegree> -b <blackdegree>')
+            print(usage)
             sys.exit()
+        elif opt == "--metrics":
+            metrics_path = arg
+        elif opt == "--profile":
+            profile_dir = arg
+        elif opt in ("-r", "--resume"):
+            resume = True
+        elif opt == "--checkpoint":
+            checkpoint_path = arg
+        elif opt == "--checkpoint-interval":
+            try :
+                checkpoint_interval = float(arg)
+            except ValueError:
+                print("The checkpoint interval is not a number")
+                sys.exit(1)
+        elif opt in ("-c", "--re-cache"):
+            re_cache = arg
+        elif opt == "--no-re-cache":
+            use_re_cache = False
+        elif opt in ("-p", "--re-workers"):
+            try :
+                re_workers = int(arg)
+            except ValueError:
+                print("The number of round eliminator workers is not an int")
+                sys.exit(1)
+        elif opt in ("-t", "--re-timeout"):
+            try :
+                re_timeout = float(arg)
+            except ValueError:
+                print("The round eliminator timeout is not a number")
+                sys.exit(1)
+        elif opt == "--re-budget":
+            try :
+                re_budget = float(arg)
+            except ValueError:
+                print("The round eliminator time budget is not a number")
+                sys.exit(1)
         elif opt in ("-w", "--wdegree"):
             try :
                 white_degree = int(arg)
@@ -36,10 +88,32 @@ def main(argv):
     min_degree = min([white_degree,black_degree])
     max_degree = max([white_degree,black_degree])
 
-    problems,relaxations,restrictions = import_data_set(min_degree,max_degree,Problem_set.Unclassified)
-    classify(problems,relaxations,restrictions, min_degree, max_degree)
+    metrics = Metrics(metrics_path,profile_dir)
+    with metrics.stage("import"):
+        problems,relaxations,restrictions = import_data_set(min_degree,max_degree,Problem_set.Unclassified)
+    cache = RoundEliminatorCache(re_cache) if use_re_cache else None
+    executor = RoundEliminatorExecutor(re_workers,re_timeout,cache=cache,metrics=metrics)
+    checkpoint = Checkpoint(checkpoint_path or default_checkpoint_path(min_degree,max_degree),restrictions.order,checkpoint_interval)
+    if resume and not checkpoint.load():
+        sys.exit(1)
+    try:
+        classify(problems,relaxations,restrictions, min_degree, max_degree, executor, checkpoint=checkpoint, metrics=metrics, re_budget=re_budget)
+    except KeyboardInterrupt:
+        checkpoint.save()
+        metrics.close()
+        print("Classification interrupted, the running round eliminator processes were stopped")
+        print("The progress was saved in " + checkpoint.path + ", run again with -r to resume")
+        sys.exit(130)
+    if executor.timeouts:
+        print(executor.timeouts, "round eliminator calls timed out")
+    if cache is not None:
+        print("Round eliminator cache :", cache.stats())
+        cache.close()
 
-    store(min_degree,max_degree,(problems,relaxations,restrictions),Problem_set.Classified)
+    with metrics.stage("store"):
+        store(min_degree,max_degree,(problems,relaxations,restrictions),Problem_set.Classified)
+    checkpoint.remove()
+    metrics.close()
 
     json_dict = dict()
     for complexity in Complexity:
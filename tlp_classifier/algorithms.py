@@ -1,6 +1,9 @@
 import numpy as np
-import itertools, tempfile, re, subprocess,os
+import itertools, tempfile, re, subprocess,os, threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from .problem import *
+from .tools import configurations, configuration_index, label_masks
 from time import time
 
 LABELS = set([0,1,2])
@@ -57,6 +60,41 @@ def redundancy_algorithm(white_constraint,black_constraint):
                 return (configurations_without(white_constraint,set([j])),configurations_without(black_constraint,set([j])), LABELS - set([j]))
     return None
 
+# Return, for each pair of labels (i, j) in the order in which redundancy_algorithm tries them, the tuple (i, j,
+# bitmask of the configurations of the given degree using label j, list of (bit of such a configuration, bit of the
+# configuration where label j is relabeled to i))
+@lru_cache(maxsize=None)
+def relabel_maps(degree):
+    index = configuration_index(degree)
+    uses = label_masks(degree)
+    maps = []
+    for i in sorted(LABELS):
+        for j in sorted(LABELS - set([i])):
+            relabel = []
+            for k,configuration in enumerate(configurations(degree)):
+                if configuration[j] != 0:
+                    lst = list(configuration)
+                    lst[i] = configuration[i]+configuration[j]
+                    lst[j] = 0
+                    relabel.append((1 << k,1 << index[tuple(lst)]))
+            maps.append((i,j,uses[j],relabel))
+    return maps
+
+# Return the image of the constraint given by its bitmask through the given relabeling
+def relabel_mask(mask, relabel):
+    image = 0
+    for source,target in relabel:
+        if mask & source:
+            image |= target
+    return image
+
+# Version of redundancy_algorithm on bitmasks: return (white mask, black mask, labels) of the problem without the
+# first redundant label found, or None
+def redundancy_masks(white_mask, black_mask, white_degree, black_degree):
+    for (i,j,white_uses,white_relabel),(_,_,black_uses,black_relabel) in zip(relabel_maps(white_degree),relabel_maps(black_degree)):
+        if not (relabel_mask(white_mask,white_relabel) & ~white_mask or relabel_mask(black_mask,black_relabel) & ~black_mask):
+            return (white_mask & ~white_uses,black_mask & ~black_uses,LABELS - set([j]))
+    return None
 
 # For tuple (2,3)
 # on the doc (3,2)
@@ -67,52 +105,140 @@ def greedy4Coloring(problem):
     if white == problem.white_constraint and black.issubset(problem.black_constraint) and len(problem.black_constraint) > 3:
         return True
 
-def round_eliminator(problem, function, iterations, labels, search_string):
-    with tempfile.NamedTemporaryFile(mode = 'w+',suffix='.txt',newline='\n') as temp_file_w, tempfile.NamedTemporaryFile(mode = 'w+',suffix='.txt',newline='\n') as temp_file_b:
-        
-        temp_file_b.write(problem.re_format_black())
-        temp_file_w.write(problem.re_format_white())
+UPPER_BOUND_PATTERN = re.compile(r'Upper bound of (\d+)')
+LOWER_BOUND_PATTERN = re.compile(r'Lower bound of (\d+)')
+
+# The runs of the round eliminator on the two orientations of a problem, started at the same time. Every line of their
+# outputs is given to update: once done(line) is true, no run can improve on the bound of the line and all the processes
+# of the race are killed.
+class Race:
+
+    def __init__(self, done = None):
+        self.done = done
+        self.stopped = False
+        self._processes = []
+        self._lock = threading.Lock()
+
+    # Register a started process, it is killed at once if the race is already decided
+    def start(self, process):
+        with self._lock:
+            self._processes.append(process)
+            if self.stopped:
+                process.kill()
+
+    def update(self, line):
+        if self.done is not None and not self.stopped and self.done(line):
+            with self._lock:
+                self.stopped = True
+                for process in self._processes:
+                    process.kill()
+
+# Return the output of the process, read line by line and given to the race if any, once the process ended
+def read_output(process, race = None):
+    lines = []
+    for line in process.stdout:
+        lines.append(line)
+        if race is not None:
+            race.update(line)
+    process.wait()
+    return ''.join(lines)
+
+# Run the round eliminator server with the given arguments (without a shell) as part of the given race, if any, and
+# return its output
+def run_server(arguments, server = SERVER_DIR, race = None):
+    try:
+        process = subprocess.Popen([server]+arguments, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    except OSError as error:
+        print("Error, could not run the round eliminator server (", error, ")")
+        return ''
+    if race is not None:
+        race.start(process)
+    with process:
+        return read_output(process,race)
+
+# Directory where problems are written in the input format of the round eliminator, once per problem and orientation
+# for the whole run, so that the calls with different parameters reuse the same files
+class ProblemSpool:
+
+    def __init__(self):
+        self._directory = tempfile.TemporaryDirectory(prefix='tlp_spool_')
+        self._paths = dict()
+
+    # Return the path of the file of the given problem, with the black (black_first) or the white constraint first
+    def path(self, problem, black_first):
+        key = (problem.white_degree,problem.black_degree,problem.white_mask,problem.black_mask,'b' if black_first else 'w')
+        path = self._paths.get(key)
+        if path is None:
+            path = os.path.join(self._directory.name,'%d_%d_%d_%d_%s.txt' % key)
+            with open(path,'w',newline='\n') as problem_file:
+                problem_file.write(problem.re_format_black() if black_first else problem.re_format_white())
+            self._paths[key] = path
+        return path
 
-        temp_file_b.flush()
-        temp_file_w.flush()
+    def cleanup(self):
+        self._directory.cleanup()
+        self._paths.clear()
 
-        result_b = subprocess.getoutput(SERVER_DIR + " " + function + ' -f ' + temp_file_b.name + ' --iter ' + str(iterations) +' --labels ' + str(labels))
-        result_w = subprocess.getoutput(SERVER_DIR + " " + function + ' -f ' + temp_file_w.name + ' --iter ' + str(iterations) +' --labels ' + str(labels))
-        return (result_b, result_w)
+SPOOL = None
 
-def round_eliminator_ub(problem, iterations, labels):
-    result_b, result_w = round_eliminator(problem, 'autoub', iterations, labels, 'Upper bound of ')
+# Return the spool shared by all the round eliminator calls of the process
+def get_spool():
+    global SPOOL
+    if SPOOL is None:
+        SPOOL = ProblemSpool()
+    return SPOOL
+
+# Run the given function of the round eliminator on the problem with the black and the white constraint first, both at
+# the same time. Both runs are stopped as soon as done(line) is true for a line of their outputs.
+# run is the function used to start the server with a list of arguments (run_server, or the one of an executor)
+# and cache an optional RoundEliminatorCache consulted before running the server.
+def round_eliminator(problem, function, iterations, labels, search_string, run = run_server, cache = None, done = None):
+    if cache is not None:
+        results = cache.get(problem, function, iterations, labels)
+        if results is not None:
+            return results
+    spool = get_spool()
+    race = Race(done)
+    with ThreadPoolExecutor(1) as pool:
+        future_w = pool.submit(run,[function, '-f', spool.path(problem,False), '--iter', str(iterations), '--labels', str(labels)],race=race)
+        result_b = run([function, '-f', spool.path(problem,True), '--iter', str(iterations), '--labels', str(labels)],race=race)
+        result_w = future_w.result()
+    # Empty outputs come from timeouts or cancellations, they are not cached. Neither are the outputs of a decided race:
+    # they are not complete and the bound that decided it depends on the bounds of the problem in this run.
+    if cache is not None and not race.stopped and result_b and result_w:
+        cache.put(problem, function, iterations, labels, (result_b, result_w))
+    return (result_b, result_w)
+
+# Return the best upper bound (smallest number of rounds) found in the output of the round eliminator, or -1
+def get_upper_bound(result):
+    return min(map(int,UPPER_BOUND_PATTERN.findall(result)),default=-1)
+
+# Return the best lower bound (largest number of rounds) found in the output of the round eliminator, or -1
+def get_lower_bound(result):
+    return max(map(int,LOWER_BOUND_PATTERN.findall(result)),default=-1)
+
+def round_eliminator_ub(problem, iterations, labels, run = run_server, cache = None):
+    # No run can find fewer rounds than the constant lower bound of the problem
+    done = lambda line : 0 <= get_upper_bound(line) <= problem.constant_lower_bound
+    result_b, result_w = round_eliminator(problem, 'autoub', iterations, labels, 'Upper bound of ', run, cache, done)
     if not result_b and not result_w:
         return -1
-        
-    def get_value(result):
-        for i in range(1000):
-            search_string_i  = 'Upper bound of ' + str(i)
-            if result.find(search_string_i) != -1:
-                return i
-        return -1
-        
-    w = get_value(result_w) if result_w else -1
-    b = get_value(result_b) if result_b else -1
+    w = get_upper_bound(result_w)
+    b = get_upper_bound(result_b)
     if w == -1:
         return b
     if b == -1:
         return w
     return min(w,b)
 
-def round_eliminator_lb(problem, iterations, labels):
-    result_b, result_w = round_eliminator(problem, 'autolb', iterations, labels, 'Lower bound of ')
+def round_eliminator_lb(problem, iterations, labels, run = run_server, cache = None):
+    # A lower bound above the constant upper bound of the problem is ignored, so no run can do better than reaching it
+    done = lambda line : get_lower_bound(line) == problem.constant_upper_bound
+    result_b, result_w = round_eliminator(problem, 'autolb', iterations, labels, 'Lower bound of ', run, cache, done)
     if not result_b and not result_w:
         return -1
-        
-    def get_value(result):
-        for i in reversed(range(1000)):
-            search_string_i  = 'Lower bound of ' + str(i)
-            if result.find(search_string_i) != -1:
-                return i
-        return -1
-    w = get_value(result_w) if result_w else -1
-    b = get_value(result_b) if result_b else -1
+    w = get_lower_bound(result_w)
+    b = get_lower_bound(result_b)
     if w > problem.constant_upper_bound:
         return b
     if b > problem.constant_upper_bound:
@@ -123,3 +249,49 @@ def cover_map_1(white_constraint,black_constraint):
     w = set([(w0-b0,w1-b1,w2-b2) for (w0,w1,w2) in black_constraint for (b0,b1,b2) in white_constraint if w0-b0 >= 0 and w1-b1 >=0 and w2-b2>=0])
     b = set([(w0a+w0b,w1a+w1b,w2a+w2b) for (w0a,w1a,w2a) in w for (w0b,w1b,w2b) in w if (w0a+w0b,w1a+w1b,w2a+w2b) in white_constraint])
     return not b
+
+# Return true if and only if the cover map criterion of cover_map_1 can hold for problems of the given degrees: the
+# sums of two differences between a black and a white configuration have the white degree only if white_degree == 2*(black_degree-white_degree)
+def cover_map_applies(white_degree, black_degree):
+    return black_degree > white_degree and white_degree == 2*(black_degree-white_degree)
+
+# Return the tables used by cover_map_masks for the given degrees:
+# the triples (black configuration, white configuration, difference) of the pairs whose difference is a configuration
+# (as bit indices, the difference in the configurations of degree black_degree-white_degree), and the pairs (white
+# configuration, bitmask of two differences) such that the sum of the two differences is the white configuration
+@lru_cache(maxsize=None)
+def cover_map_tables(white_degree, black_degree):
+    differences = configuration_index(black_degree-white_degree)
+    white_configurations = configurations(white_degree)
+    white_index = configuration_index(white_degree)
+    pairs = []
+    for j,(b0,b1,b2) in enumerate(configurations(black_degree)):
+        for i,(w0,w1,w2) in enumerate(white_configurations):
+            if b0-w0 >= 0 and b1-w1 >= 0 and b2-w2 >= 0:
+                pairs.append((j,i,differences[(b0-w0,b1-w1,b2-w2)]))
+    sums = set()
+    for a,(a0,a1,a2) in enumerate(differences):
+        for b,(c0,c1,c2) in enumerate(differences):
+            if (a0+c0,a1+c1,a2+c2) in white_index:
+                sums.add((white_index[(a0+c0,a1+c1,a2+c2)],1 << a | 1 << b))
+    return (pairs,sorted(sums))
+
+# Batch version of cover_map_1 on the problems given by arrays of bitmasks, return the array of the results.
+# Only meaningful when cover_map_applies(white_degree, black_degree).
+def cover_map_masks(white_masks, black_masks, white_degree, black_degree):
+    pairs,sums = cover_map_tables(white_degree,black_degree)
+    large = max(len(configurations(white_degree)),len(configurations(black_degree)),len(configurations(black_degree-white_degree))) > 64
+    dtype = object if large else np.uint64
+    white_masks,black_masks = np.array(white_masks,dtype=dtype),np.array(black_masks,dtype=dtype)
+    def cast(value):
+        return value if large else np.uint64(value)
+    def bit(masks, i):
+        return (masks >> cast(i)) & cast(1) == 1
+    differences = np.zeros(len(white_masks),dtype=dtype)
+    differences[:] = cast(0)
+    for j,i,d in pairs:
+        differences |= np.where(bit(black_masks,j) & bit(white_masks,i),cast(1 << d),cast(0))
+    found = np.zeros(len(white_masks),dtype=bool)
+    for i,mask in sums:
+        found |= bit(white_masks,i) & (differences & cast(mask) == cast(mask))
+    return ~found
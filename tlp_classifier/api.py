@@ -1,10 +1,11 @@
 import numpy
-from .file_help import import_data_set
+from .file_help import import_data_set, load_data_set
 from .problem import Problem,alpha_to_problem
 from .complexity import Complexity
 from timeit import default_timer as timer
 from .input import LOGARITHMIC_LOWER_BOUND
 from .problem_set import Problem_set
+from .indexes import ProblemIndexes
 
 # Get the complexity of a problem
 def get_problem(white_constraint,black_constraint, problems):
@@ -18,12 +19,12 @@ def get_problem(white_constraint,black_constraint, problems):
     print("error : The problem was incorrectly entered (wrong degree or more than 3 labels)")
 
 # Get the relaxations of a given problem
-def get_relaxations_of(alpha_problem,problems,relaxations,restrictions):
-    return relaxations[get_problem(alpha_problem,problems)]
+def get_relaxations_of(white_constraint,black_constraint,problems,relaxations,restrictions):
+    return relaxations[get_problem(white_constraint,black_constraint,problems)]
 
 # Get the restrictions of a given problem
-def get_restrictions_of(alpha_problem,problems,relaxations,restrictions):
-    return restrictions[get_problem(alpha_problem,problems)]
+def get_restrictions_of(white_constraint,black_constraint,problems,relaxations,restrictions):
+    return restrictions[get_problem(white_constraint,black_constraint,problems)]
 
 # Get the set of unclassified problems
 def get_unclassified_problems(problems,relaxations,restrictions):
@@ -54,16 +55,131 @@ def get_upper_bounds_constant_problems(problems):
             res[ub] = res.get(ub,0) + 1
     return res
 
-WHITE_DEGREE = 3
-BLACK_DEGREE = 2
+# Query interface to a stored problem set of the given degrees. The data set is opened (memory mapped) on the first query,
+# and the problems are found through an index from the bitmasks of the characteristic problems to their positions,
+# the problems given in alpha form are canonicalized once and remembered.
+class ProblemDatabase:
 
-problems,relaxations,restrictions = import_data_set(WHITE_DEGREE, BLACK_DEGREE,Problem_set.Classified)
-black_constraint = {'BC','AA'}
-white_constraint = {'AAC', 'BBB'}
+    def __init__(self, white_degree, black_degree, classified = Problem_set.Classified, path = None):
+        self.white_degree = min(white_degree,black_degree)
+        self.black_degree = max(white_degree,black_degree)
+        self.classified = classified
+        self.path = path
+        self._data_set = None
+        self._index = None
+        self._problems = dict()
+        self._positions = dict()
+        self._indexes = None
 
-print(get_problem(black_constraint,white_constraint,problems))
+    # Return the underlying data set, opened on the first call
+    def data_set(self):
+        if self._data_set is None:
+            self._data_set = load_data_set(self.white_degree,self.black_degree,self.classified,self.path)
+        return self._data_set
 
-#print(get_upper_bounds_constant_problems(problems))
+    # Return the dictionary from the bitmasks (white, black) of the problems to their positions in the data set
+    def index(self):
+        if self._index is None:
+            data_set = self.data_set()
+            self._index = {masks : i for i,masks in enumerate(zip(data_set.white_masks.tolist(),data_set.black_masks.tolist()))}
+        return self._index
 
-#for elem in get_constant_problems_with_x_rounds_UB(9,problems):
-#    print(elem)
+    def __len__(self):
+        return len(self.data_set())
+
+    # Return the problem at the given position, a position always gives the same instance
+    def problem_at(self, i):
+        problem = self._problems.get(i)
+        if problem is None:
+            problem = self._problems[i] = self.data_set().problem(i)
+        return problem
+
+    # Return the position of the problem given in alpha form, or None if it is not in the data set
+    def position(self, white_constraint, black_constraint):
+        alpha = (frozenset(white_constraint),frozenset(black_constraint))
+        if alpha in self._positions:
+            return self._positions[alpha]
+        problem = alpha_to_problem(white_constraint,black_constraint)
+        i = None
+        if problem is not None and (problem.white_degree,problem.black_degree) == (self.white_degree,self.black_degree):
+            i = self.index().get((problem.white_mask,problem.black_mask))
+        self._positions[alpha] = i
+        return i
+
+    # Return the problem given in alpha form, or None if it is not in the data set
+    def get_problem(self, white_constraint, black_constraint):
+        i = self.position(white_constraint,black_constraint)
+        if i is None:
+            print("error : The problem was incorrectly entered (empty configuration set, wrong degree or more than 3 labels)")
+            return
+        return self.problem_at(i)
+
+    # Return the list of the problems given as a list of pairs (white constraint, black constraint) in alpha form,
+    # with None for the problems that are not in the data set
+    def get_problems(self, alpha_problems):
+        positions = [self.position(white_constraint,black_constraint) for white_constraint,black_constraint in alpha_problems]
+        return [None if i is None else self.problem_at(i) for i in positions]
+
+    # Return the secondary indexes of the problem set, built on the first call from the whole data set
+    def indexes(self):
+        if self._indexes is None:
+            problems,relaxations,restrictions = self.data_set().to_problems()
+            self._problems = {**dict(enumerate(restrictions.order)),**self._problems}
+            self._indexes = ProblemIndexes(problems,relaxations,restrictions)
+        return self._indexes
+
+    # Return the set of the problems of the given complexity
+    def get_problems_of_complexity(self, complexity):
+        return self.indexes().problems_of_complexity(complexity)
+
+    # Return the set of the unclassified problems
+    def get_unclassified_problems(self):
+        return self.indexes().problems_of_complexity(Complexity.Unclassified)
+
+    # Return the set of the constant problems that have the given upper bound
+    def get_constant_problems_with_x_rounds_UB(self, x):
+        return self.indexes().constant_problems_with_upper_bound(x)
+
+    # Return the distribution of the upper bounds on constant problems
+    def get_upper_bounds_constant_problems(self):
+        return self.indexes().upper_bounds_constant_problems()
+
+    # Return the set of the unclassified problems without unclassified relaxations
+    def get_UC_problems_with_C_relaxations(self):
+        return set(self.indexes().frontier_relaxations)
+
+    # Return the set of the unclassified problems without unclassified restrictions
+    def get_UC_with_C_restrictions(self):
+        return set(self.indexes().frontier_restrictions)
+
+    # Return the positions of the problems reachable from the given position through the given neighbours function
+    def _reachable(self, i, neighbours, direct):
+        if direct:
+            return neighbours(i).tolist()
+        seen = {i}
+        stack = [i]
+        while stack:
+            for j in neighbours(stack.pop()).tolist():
+                if j not in seen:
+                    seen.add(j)
+                    stack.append(j)
+        seen.remove(i)
+        return seen
+
+    # Return the set of the relaxations of the problem given in alpha form, only the direct ones if direct is true
+    def get_relaxations_of(self, white_constraint, black_constraint, direct = False):
+        i = self.position(white_constraint,black_constraint)
+        if i is None:
+            return
+        return {self.problem_at(j) for j in self._reachable(i,self.data_set().relaxations_of,direct)}
+
+    # Return the set of the restrictions of the problem given in alpha form, only the direct ones if direct is true
+    def get_restrictions_of(self, white_constraint, black_constraint, direct = False):
+        i = self.position(white_constraint,black_constraint)
+        if i is None:
+            return
+        return {self.problem_at(j) for j in self._reachable(i,self.data_set().restrictions_of,direct)}
+
+if __name__ == "__main__":
+    database = ProblemDatabase(2,3)
+    print(database.get_problem({'BC','AA'},{'AAC', 'BBB'}))
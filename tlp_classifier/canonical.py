@@ -0,0 +1,73 @@
+import itertools
+from functools import lru_cache
+from .tools import configurations, configuration_index
+
+# The permutations of the labels, the identity first
+LABEL_PERMUTATIONS = list(itertools.permutations([0,1,2]))
+
+# Return, for each permutation of the labels, a table giving the image of every bitmask of configurations of the given degree
+@lru_cache(maxsize=None)
+def permutation_tables(degree):
+    configs = configurations(degree)
+    index = configuration_index(degree)
+    tables = []
+    for a,b,c in LABEL_PERMUTATIONS:
+        image = [1 << index[(t[a],t[b],t[c])] for t in configs]
+        table = [0]*(1 << len(configs))
+        for mask in range(1,len(table)):
+            low = mask & -mask
+            table[mask] = table[mask ^ low] | image[low.bit_length()-1]
+        tables.append(table)
+    return tables
+
+# Return the tables (rank, unrank) that order the bitmasks of the given degree like the sorted lists of their configurations
+@lru_cache(maxsize=None)
+def rank_tables(degree):
+    n = len(configurations(degree))
+    unrank = sorted(range(1 << n), key=lambda mask: [i for i in range(n) if mask >> i & 1])
+    rank = [0]*len(unrank)
+    for i,mask in enumerate(unrank):
+        rank[mask] = i
+    return (rank,unrank)
+
+# Return the tables used to canonicalize the problems of the given degrees:
+# for each permutation of the labels, the rank of the image of a white (resp. black) bitmask shifted to the
+# white (resp. black) position of the key, whether the white and black constraints can be swapped,
+# and what is needed to decode a key.
+@lru_cache(maxsize=None)
+def canonical_tables(white_degree, black_degree):
+    black_bits = len(configurations(black_degree))
+    white_rank,white_unrank = rank_tables(white_degree)
+    black_rank,black_unrank = rank_tables(black_degree)
+    white_keys = [[white_rank[image] << black_bits for image in table] for table in permutation_tables(white_degree)]
+    black_keys = [[black_rank[image] for image in table] for table in permutation_tables(black_degree)]
+    return (list(zip(white_keys,black_keys)),white_degree == black_degree,white_unrank,black_unrank,black_bits)
+
+# Return the key of the characteristic problem of the class of the given problem.
+# Keys are ordered like the sorted lists of configurations used by the former characteristic problem definition.
+def canonical_key(white_mask, black_mask, white_degree, black_degree):
+    tables,swap,_,_,_ = canonical_tables(white_degree,black_degree)
+    key = min([white_keys[white_mask] | black_keys[black_mask] for white_keys,black_keys in tables])
+    if swap:
+        key = min(key,min([white_keys[black_mask] | black_keys[white_mask] for white_keys,black_keys in tables]))
+    return key
+
+# Return the bitmasks (white, black) of the characteristic problem of the class of the given problem
+def canonical_masks(white_mask, black_mask, white_degree, black_degree):
+    _,_,white_unrank,black_unrank,black_bits = canonical_tables(white_degree,black_degree)
+    key = canonical_key(white_mask,black_mask,white_degree,black_degree)
+    return (white_unrank[key >> black_bits],black_unrank[key & ((1 << black_bits)-1)])
+
+# Return true if and only if the given problem is the characteristic problem of its class
+def is_canonical(white_mask, black_mask, white_degree, black_degree):
+    tables,_,_,_,_ = canonical_tables(white_degree,black_degree)
+    white_keys,black_keys = tables[0]
+    return white_keys[white_mask] | black_keys[black_mask] == canonical_key(white_mask,black_mask,white_degree,black_degree)
+
+# Return the bitmasks (white, black) of all the problems equivalent to the given problem
+def equivalent_masks(white_mask, black_mask, white_degree, black_degree):
+    white_tables,black_tables = permutation_tables(white_degree),permutation_tables(black_degree)
+    res = [(white_table[white_mask],black_table[black_mask]) for white_table,black_table in zip(white_tables,black_tables)]
+    if white_degree == black_degree:
+        res += [(b,w) for w,b in res]
+    return res
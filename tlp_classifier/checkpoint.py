@@ -0,0 +1,123 @@
+import os
+import numpy as np
+from time import time
+from .complexity import Complexity
+from .file_help import add_degree_suffix
+
+# Return the default path of the checkpoint file of the classification of the given degrees
+def default_checkpoint_path(white_degree, black_degree):
+    dir_path = os.path.dirname(os.path.realpath(__file__))
+    return os.path.join(dir_path, add_degree_suffix("data/checkpoint",min(white_degree,black_degree),max(white_degree,black_degree)) + '.npz')
+
+# Checkpoint of a classification, stored in a compressed NumPy file: the bounds of the problems (in the given order),
+# the stages that are completed, for each stage in progress, the positions of its candidates and of the problems it
+# already handled and, for each kind of round eliminator passes, the time of the calls that timed out per problem (the
+# costs used by an EscalationPolicy, the other calls and the summaries of the passes are not saved).
+# The file is written after every completed stage and at most every interval seconds during a stage, it is replaced
+# atomically so a kill never leaves a broken checkpoint.
+class Checkpoint:
+
+    def __init__(self, path, order, interval = 60.0):
+        self.path = path
+        self.order = order
+        self.interval = interval
+        self.completed = []
+        self.candidates = dict()
+        self.handled = dict()
+        self.timeouts = dict()
+        self._position = None
+        self._last_save = time()
+
+    # Return the position of the given problem in the order
+    def position(self, problem):
+        if self._position is None:
+            self._position = {problem : i for i,problem in enumerate(self.order)}
+        return self._position[problem]
+
+    # Write the checkpoint file
+    def save(self):
+        arrays = {
+            'white_masks' : np.array([problem.white_mask for problem in self.order],dtype=np.uint64),
+            'black_masks' : np.array([problem.black_mask for problem in self.order],dtype=np.uint64),
+            'lower_bounds' : np.array([problem.lower_bound.value for problem in self.order],dtype=np.uint8),
+            'upper_bounds' : np.array([problem.upper_bound.value for problem in self.order],dtype=np.uint8),
+            'constant_lower_bounds' : np.array([problem.constant_lower_bound for problem in self.order],dtype=np.int64),
+            'constant_upper_bounds' : np.array([problem.constant_upper_bound for problem in self.order],dtype=np.int64),
+            'completed' : np.array(self.completed,dtype=str)
+        }
+        for stage,positions in self.candidates.items():
+            arrays['candidates_' + stage] = np.array(sorted(positions),dtype=np.int64)
+        for stage,positions in self.handled.items():
+            arrays['handled_' + stage] = np.array(sorted(positions),dtype=np.int64)
+        for kind,seconds in self.timeouts.items():
+            arrays['timeouts_' + kind] = np.array(sorted(seconds),dtype=np.int64)
+            arrays['timeout_seconds_' + kind] = np.array([seconds[i] for i in sorted(seconds)],dtype=np.float64)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)),exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path,'wb') as checkpoint_file:
+            np.savez_compressed(checkpoint_file,**arrays)
+        os.replace(tmp_path,self.path)
+        self._last_save = time()
+
+    # Restore the bounds and the progress from the checkpoint file, return false if there is no usable checkpoint
+    def load(self):
+        if not os.path.exists(self.path):
+            print("Error, there is no checkpoint to resume from (" + self.path + ")")
+            return False
+        with np.load(self.path) as data:
+            if len(data['white_masks']) != len(self.order) or\
+                data['white_masks'].tolist() != [problem.white_mask for problem in self.order] or\
+                data['black_masks'].tolist() != [problem.black_mask for problem in self.order]:
+                print("Error, the checkpoint " + self.path + " was made on another data set")
+                return False
+            lower_bounds,upper_bounds = data['lower_bounds'].tolist(),data['upper_bounds'].tolist()
+            constant_lower_bounds,constant_upper_bounds = data['constant_lower_bounds'].tolist(),data['constant_upper_bounds'].tolist()
+            for i,problem in enumerate(self.order):
+                problem.lower_bound,problem.upper_bound = Complexity(lower_bounds[i]),Complexity(upper_bounds[i])
+                problem.constant_lower_bound,problem.constant_upper_bound = constant_lower_bounds[i],constant_upper_bounds[i]
+            self.completed = data['completed'].tolist()
+            self.candidates = {name[len('candidates_'):] : set(data[name].tolist()) for name in data.files if name.startswith('candidates_')}
+            self.handled = {name[len('handled_'):] : set(data[name].tolist()) for name in data.files if name.startswith('handled_')}
+            self.timeouts = {name[len('timeouts_'):] : dict(zip(data[name].tolist(),data['timeout_seconds_' + name[len('timeouts_'):]].tolist())) for name in data.files if name.startswith('timeouts_')}
+        return True
+
+    # Return true if and only if the given stage was completed
+    def is_completed(self, stage):
+        return stage in self.completed
+
+    # Record that the given stage is completed and write the checkpoint
+    def complete(self, stage):
+        self.completed.append(stage)
+        self.candidates.pop(stage,None)
+        self.handled.pop(stage,None)
+        self.save()
+
+    # Return the candidates of the given stage that are not handled yet. The candidates recorded when the stage started
+    # are used if there are some, otherwise the given ones are recorded.
+    def remaining(self, stage, candidates):
+        if stage not in self.candidates:
+            self.candidates[stage] = {self.position(problem) for problem in candidates}
+            self.save()
+        handled = self.handled.get(stage,set())
+        return {self.order[i] for i in self.candidates[stage] if i not in handled}
+
+    # Record that the given stage handled the given problem, the checkpoint is written if the last one is too old
+    def handle(self, stage, problem):
+        self.handled.setdefault(stage,set()).add(self.position(problem))
+        if time() - self._last_save >= self.interval:
+            self.save()
+
+    # Record that a round eliminator call of the given kind on the problem timed out after the given time
+    def timeout(self, kind, problem, seconds):
+        timeouts = self.timeouts.setdefault(kind,dict())
+        position = self.position(problem)
+        timeouts[position] = timeouts.get(position,0.0) + seconds
+
+    # Return the pairs (problem, time) of the round eliminator calls of the given kind that timed out
+    def timeouts_of(self, kind):
+        return [(self.order[i],seconds) for i,seconds in self.timeouts.get(kind,dict()).items()]
+
+    # Remove the checkpoint file
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -1,133 +1,234 @@
 #!/usr/bin/python3
 
-from .problem import Problem,Constraints,alpha_to_problem
+from .problem import Problem,Constraints
 from .complexity import Complexity,complexity_name
 from tqdm import tqdm
 import json
 import pickle
 from time import time
 from .tools import *
-from .algorithms import constraint_reduction,redundancy_algorithm, greedy4Coloring,cover_map_1, round_eliminator_lb, round_eliminator_ub
+from .algorithms import constraint_reduction,redundancy_masks, greedy4Coloring,cover_map_applies,cover_map_masks, round_eliminator_lb, round_eliminator_ub
 from .file_help import problems_to_file,add_degree_suffix,store
 from bitarray import bitarray, util
-from .two_labels_classifier import get_complexity_of,constraints_to_bitvector_tuple
-from .input import ITERATED_LOGARITHMIC_TIGHT, ITERATED_LOGARITHMIC_UPPER_BOUND, LOGARITHMIC_UPPER_BOUND, LOGARITHMIC_TIGHT, LOGARITHMIC_LOWER_BOUND
+from .two_labels_classifier import get_complexities,masks_to_patterns
+from .known_results import load_known_results
+from .executor import RoundEliminatorExecutor
+from .propagation import Propagator
+from .indexes import ProblemIndexes
+from .scheduling import ImplicationScheduler, EscalationPolicy
+from .metrics import Metrics
 from pathlib import Path
+import sys
+from functools import partial
 
 LABELS = frozenset([0,1,2])
 
-def compute_relaxations(problems, that, complexity,relaxations):
-    for problem in that:
-        for relax in relaxations[problem]:
-            relax.set_upper_bound(complexity)
-            if complexity == Complexity.Constant:
-                relax.constant_upper_bound = min(relax.constant_upper_bound,problem.constant_upper_bound)
+# Push the upper bounds of the problems to their relaxations in one sweep over the Hasse diagram of the restrictions
+def propagate_upper_bounds(restrictions):
+    for problem in restrictions.order:
+        for restr in restrictions.covers[problem]:
+            problem.set_upper_bound(restr.upper_bound)
+            if restr.upper_bound == Complexity.Constant:
+                problem.constant_upper_bound = min(problem.constant_upper_bound,restr.constant_upper_bound)
 
-def compute_restrictions(problems, that, complexity,restrictions):
-    for problem in that:
-        for restr in restrictions[problem]:
-            restr.set_lower_bound(complexity)
-            if complexity == Complexity.Constant:
-                restr.constant_lower_bound = max(restr.constant_lower_bound,problem.constant_lower_bound)
+# Push the lower bounds of the problems to their restrictions in one sweep over the Hasse diagram of the relaxations
+def propagate_lower_bounds(relaxations):
+    for problem in relaxations.order:
+        for relax in relaxations.covers[problem]:
+            if relax.lower_bound != Complexity.Constant:
+                problem.set_lower_bound(relax.lower_bound)
+            problem.constant_lower_bound = max(problem.constant_lower_bound,relax.constant_lower_bound)
 
 def propagate(problems,restrictions,relaxations):
     print("Propagating the lower and upper bounds")
-    for complexity in tqdm(Complexity):
-        if complexity != Complexity.Unclassified:
-            if complexity != Complexity.Constant:
-                LBSubset = {x for x in problems if x.lower_bound == complexity}
-                compute_restrictions(problems, LBSubset,complexity,restrictions)
-            UBSubset = {x for x in problems if x.upper_bound == complexity}
-            compute_relaxations(problems, UBSubset,complexity,relaxations)
+    propagate_lower_bounds(relaxations)
+    propagate_upper_bounds(restrictions)
     
 # Return the subset of unsolvable problems
 def unsolvable_criteria(problem):
-    if(len(problem.white_constraint)==0 or len(problem.black_constraint)==0):
+    if(problem.white_mask == 0 or problem.black_mask == 0):
         problem.set_complexity(Complexity.Unsolvable)
     else:
         problem.set_upper_bound(Complexity.Global)
 
-def two_labels_criteria(problem):
-    # Problems that are 2 labelling problems
-    if len(problem.alphabet()) < 3 and len(problem.white_constraint) > 0 and len(problem.black_constraint) > 0:
-        problem.set_complexity(get_complexity_of(*constraints_to_bitvector_tuple(problem.white_constraint,problem.black_constraint,problem.alphabet(),problem.white_degree,problem.black_degree)))
-        return
-    # Redundancy of a label
-    if problem.alphabet_size() == 3:
-        tmp = redundancy_algorithm(problem.white_constraint,problem.black_constraint)
-        if tmp != None:
-            problem.set_complexity(get_complexity_of(*constraints_to_bitvector_tuple(tmp[0],tmp[1],tmp[2],problem.white_degree,problem.black_degree)))
+# Run the binary labelling classifier, in one batch per degrees, on the given problems that use two labels and on the
+# ones with three labels one of which is redundant. Return the list of pairs (problem, complexity) of these problems.
+def two_labels_classification(problems):
+    batches = dict()
+    for problem in problems:
+        alphabet = problem.alphabet()
+        if len(alphabet) < 3 and problem.white_mask != 0 and problem.black_mask != 0:
+            # Problems that are 2 labelling problems
+            batch = (problem,problem.white_mask,problem.black_mask,list(alphabet)[0])
+        elif len(alphabet) == 3:
+            # Redundancy of a label
+            tmp = redundancy_masks(problem.white_mask,problem.black_mask,problem.white_degree,problem.black_degree)
+            if tmp == None:
+                continue
+            batch = (problem,tmp[0],tmp[1],list(tmp[2])[0])
+        else:
+            continue
+        batches.setdefault((problem.white_degree,problem.black_degree),[]).append(batch)
+    res = []
+    for (white_degree,black_degree),batch in batches.items():
+        candidates,white_masks,black_masks,labels = zip(*batch)
+        white_patterns = masks_to_patterns(white_masks,labels,white_degree)
+        black_patterns = masks_to_patterns(black_masks,labels,black_degree)
+        complexities = get_complexities(white_patterns,black_patterns,white_degree,black_degree)
+        res.extend(zip(candidates,map(Complexity,complexities.tolist())))
+    return res
 
 def greedy_4_coloring_test(problem):
     if greedy4Coloring(problem):
         problem.set_upper_bound(Complexity.Iterated_Logarithmic)
 
-def cover_map_test(problem):
-    if cover_map_1(problem.white_constraint,problem.black_constraint):
-        problem.set_lower_bound(Complexity.Iterated_Logarithmic)
-    
-def classify(problems,relaxations,restrictions, white_degree, black_degree):
+# Return the problems among the given ones that satisfy the cover map criterion, evaluated on all of them at once
+def cover_map_problems(problems, white_degree, black_degree):
+    problems = list(problems)
+    results = cover_map_masks([problem.white_mask for problem in problems],[problem.black_mask for problem in problems],white_degree,black_degree)
+    return [problem for problem,result in zip(problems,results.tolist()) if result]
+
+# Classify the problems. The round eliminator calls are run by the given executor (one call at a time by default).
+# With a checkpoint, the progress is recorded after every stage and regularly during the round eliminator stages, and the
+# stages recorded as completed by the checkpoint (restored with checkpoint.load) are skipped. The checkpoint may be saved
+# in the middle of a propagation, so on a resume the bounds of all the problems are propagated before the stages. The
+# time of the round eliminator calls that timed out is kept by the checkpoint, the summaries of the passes only count
+# the calls made after the resume.
+# Every stage is measured by the given Metrics, if any, with the number of problems it classified (in total and per
+# complexity) and of bound changes.
+# The round eliminator settings are escalated by an EscalationPolicy, re_budget limits the time of every pass in seconds.
+def classify(problems,relaxations,restrictions, white_degree, black_degree, executor = None, known_results = None, indexes = None, checkpoint = None, metrics = None, re_budget = None):
     print("Starting classification (" + str(len(problems)) + " problems)...")
+    executor = executor or RoundEliminatorExecutor()
+    known_results = known_results or load_known_results()
+    indexes = indexes or ProblemIndexes(problems,relaxations,restrictions)
+    metrics = metrics or Metrics()
+    propagator = Propagator(relaxations,restrictions,[indexes.update,lambda problem,before : metrics.count("bound_changes")])
+    resumed = checkpoint is not None and len(checkpoint.completed) > 0
     
     def unclassified_problems(problems):
-        return {problem for problem in problems if problem.get_complexity() == Complexity.Unclassified}
+        return indexes.problems_of_complexity(Complexity.Unclassified)
     def solvable_problems(problems):
         return {problem for problem in problems if problem.get_complexity() != Complexity.Unsolvable}
 
+    # Run the stage unless the checkpoint records it as completed
+    def stage(name, function, **parameters):
+        if checkpoint is not None and checkpoint.is_completed(name):
+            print("Skipping the stage " + name + ", completed before the checkpoint")
+            return
+        sizes = {complexity : len(indexes.by_complexity[complexity]) for complexity in Complexity}
+        with metrics.stage(name,**parameters):
+            function()
+            metrics.count("classified",sizes[Complexity.Unclassified] - len(indexes.by_complexity[Complexity.Unclassified]))
+            # A classified problem keeps its complexity, the sets of the other complexities only grow
+            for complexity in Complexity:
+                classified = len(indexes.by_complexity[complexity]) - sizes[complexity]
+                if complexity != Complexity.Unclassified and classified > 0:
+                    metrics.count("classified_" + complexity_name[complexity],classified)
+        if checkpoint is not None:
+            checkpoint.complete(name)
+
+    # The problems whose bounds are changed by the function are propagated by the next call to propagator.propagate
     def partially_classify(function):
         for problem in tqdm(unclassified_problems(problems)):
-            function(problem)
+            propagator.apply(function,problem)
+
+    # Run a round eliminator pass with the given setting (iterations, labels) on the candidates that the checkpoint does
+    # not record as handled by this pass. The calls are ordered by an ImplicationScheduler over the relation along which
+    # the bounds found are propagated, and the candidates that got a bound from the previous results are dropped. The
+    # candidates that timed out with cheaper settings are queried after the others. No call is started once the time
+    # budget of the policy is spent.
+    def partially_classify_RE(name, function, candidates, is_candidate, relation, policy, setting, set_bound, record):
+        if checkpoint is not None:
+            candidates = checkpoint.remaining(name,candidates)
+        metrics.count("candidates",len(candidates))
+        scheduler = ImplicationScheduler(relation,candidates,is_candidate,policy.cost)
+        propagator.listeners.append(scheduler.update)
+        policy.start(setting,len(candidates))
+        next_problem = lambda : None if policy.out_of_budget() else scheduler.next()
+        try:
+            for problem,bound in tqdm(executor.schedule(function, next_problem, setting[0], setting[1], partial(record,setting)), total=len(candidates)):
+                if bound >= 0:
+                    metrics.count("bounds_found")
+                    set_bound(problem,bound)
+                if checkpoint is not None:
+                    checkpoint.handle(name,problem)
+        finally:
+            propagator.listeners.remove(scheduler.update)
+        resolved = sum(1 for problem in candidates if not is_candidate(problem))
+        policy.resolved(setting,resolved)
+        metrics.count("resolved",resolved)
+        metrics.count("dropped",len(scheduler.dropped))
+        metrics.count("not_queried",scheduler.pending.bit_count())
+
+    # Run the passes of the settings of the policy, each one on the candidates that are still open. The calls that timed
+    # out are recorded in the checkpoint under the prefix.
+    def partially_classify_RE_passes(prefix, bound_name, function, policy, is_candidate, relation, set_bound):
+        def record_with_checkpoint(setting, problem, seconds, timed_out):
+            policy.record(setting,problem,seconds,timed_out)
+            if timed_out:
+                checkpoint.timeout(prefix,problem,seconds)
+        record = policy.record if checkpoint is None else record_with_checkpoint
+        if checkpoint is not None:
+            for problem,seconds in checkpoint.timeouts_of(prefix):
+                policy.restore(problem,seconds)
+        for i,setting in enumerate(policy.settings):
+            print("Running the round eliminator's auto " + bound_name + " feature with the following parameters : iterations = " + str(setting[0]) + ", labels = " + str(setting[1]))
+            candidates = {x for x in problems if is_candidate(x)}
+            stage(prefix + str(i),partial(partially_classify_RE,prefix + str(i),function,candidates,is_candidate,relation,policy,setting,set_bound,record),iterations=setting[0],labels=setting[1])
+        for setting,summary in policy.summary.items():
+            print("Round eliminator " + bound_name + " (iterations = " + str(setting[0]) + ", labels = " + str(setting[1]) + ") : " + str(summary["resolved"]) + " of " + str(summary["candidates"]) + " candidates resolved with " + str(summary["calls"]) + " calls in " + format(summary["time"],".1f") + " s, " + str(summary["timeouts"]) + " timeouts")
 
     def partially_classify_RE_ub():
-        iter_label = [(20,3),(8,4),(9,4)]
-        for i in range(len(iter_label)):
-            print("Running the round eliminator's auto upper bound feature with the following parameters : iterations = " + str(iter_label[i][0]) + ", labels = " + str(iter_label[i][1]))
-            for problem in tqdm({x for x in problems if x.lower_bound == Complexity.Constant and x.constant_upper_bound == sys.maxsize}):
-                ub = round_eliminator_ub(problem, iter_label[i][0], iter_label[i][1])
-                if ub >= 0:
-                    problem.set_complexity(Complexity.Constant)
-                    problem.constant_upper_bound = min(problem.constant_upper_bound,ub)
-            propagate(problems,restrictions,relaxations)
+        is_candidate = lambda x : x.lower_bound == Complexity.Constant and x.constant_upper_bound == sys.maxsize
+        partially_classify_RE_passes("re_ub_","upper bound",round_eliminator_ub,EscalationPolicy([(20,3),(8,4),(9,4)],re_budget),is_candidate,relaxations,propagator.set_constant_upper_bound)
     
     def partially_classify_RE_lb():
-        iter_label = [(15,5)]
-        for i in range(len(iter_label)):
-            print("Running the round eliminator's auto lower bound feature with the following parameters : iterations = " + str(iter_label[i][0]) + ", labels = " + str(iter_label[i][1]))
-            for problem in tqdm({x for x in problems if x.upper_bound == Complexity.Constant and x.constant_lower_bound != x.constant_upper_bound}):
-                lb = round_eliminator_lb(problem, iter_label[i][0], iter_label[i][1])
-                if lb >= 0:
-                    problem.set_complexity(Complexity.Constant)
-                    problem.constant_lower_bound = max(problem.constant_lower_bound,lb)
-            propagate(problems,restrictions,relaxations)
+        is_candidate = lambda x : x.upper_bound == Complexity.Constant and x.constant_lower_bound != x.constant_upper_bound
+        partially_classify_RE_passes("re_lb_","lower bound",round_eliminator_lb,EscalationPolicy([(15,5)],re_budget),is_candidate,restrictions,propagator.set_constant_lower_bound)
     
 
     def partially_classify_debug(function):
         for problem in tqdm(solvable_problems(problems)):
             function(problem)
 
+    def two_labels_stage():
+        for problem,complexity in two_labels_classification(unclassified_problems(problems)):
+            propagator.apply(lambda x : x.set_complexity(complexity),problem)
+
+    def cover_map_stage():
+        for problem in cover_map_problems(unclassified_problems(problems),white_degree,black_degree):
+            propagator.apply(lambda x : x.set_lower_bound(Complexity.Iterated_Logarithmic),problem)
+
+    def known_results_stage():
+        for known,_ in known_results.entries(white_degree,black_degree):
+            problem = restrictions.get(known)
+            if problem is not None:
+                propagator.apply(known_results.apply,problem)
+
+    def propagation_stage():
+        propagator.propagate()
+
+    if resumed:
+        print("Propagating the bounds restored from the checkpoint")
+        propagator.propagate(problems)
+
     print("Checking the solvability of the problems")
-    partially_classify(unsolvable_criteria)
+    stage("unsolvable",partial(partially_classify,unsolvable_criteria))
     print("Running the binary labelling classifier on binary problems and redundant ternary problems")
-    partially_classify(two_labels_criteria)
+    stage("two_labels",two_labels_stage)
 
-    if white_degree == 2 and black_degree == 3:
+    if cover_map_applies(white_degree,black_degree):
         print("Running algorithm for iterated logarithmic lower bounds using cover map")
-        partially_classify(cover_map_test)
+        stage("cover_map",cover_map_stage)
+    if white_degree == 2 and black_degree == 3:
         print("Running the algorithm for iterated logarithmic upper bounds using greedy 4 coloring")
-        partially_classify(greedy_4_coloring_test)
-        for problem in problems:
-            if any([problem == alpha_to_problem(elem[0],elem[1]) for elem in LOGARITHMIC_UPPER_BOUND]):
-                problem.set_upper_bound(Complexity.Logarithmic)
-            if any([problem == alpha_to_problem(elem[0],elem[1]) for elem in LOGARITHMIC_TIGHT]):
-                problem.set_complexity(Complexity.Logarithmic)
-            if any([problem == alpha_to_problem(elem[0],elem[1]) for elem in LOGARITHMIC_LOWER_BOUND]):
-                problem.set_lower_bound(Complexity.Logarithmic)
-            if any([problem == alpha_to_problem(elem[0],elem[1]) for elem in ITERATED_LOGARITHMIC_TIGHT]):
-                problem.set_complexity(Complexity.Iterated_Logarithmic)
-            if any([problem == alpha_to_problem(elem[0],elem[1]) for elem in ITERATED_LOGARITHMIC_UPPER_BOUND]):
-                problem.set_upper_bound(Complexity.Iterated_Logarithmic)
+        stage("greedy_4_coloring",partial(partially_classify,greedy_4_coloring_test))
+
+    print("Setting the bounds of the known results")
+    stage("known_results",known_results_stage)
     
-    propagate(problems,restrictions,relaxations)
+    print("Propagating the lower and upper bounds")
+    stage("propagation",propagation_stage)
     partially_classify_RE_ub()
     partially_classify_RE_lb()
-
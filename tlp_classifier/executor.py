@@ -0,0 +1,120 @@
+import subprocess, threading, time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import partial
+from .algorithms import SERVER_DIR, read_output
+
+# Runs round eliminator calls concurrently. Each call starts its own server processes (one per orientation of the problem,
+# at the same time), the workers only wait for them, so a pool of threads is enough to keep `workers` calls running.
+# A server process running longer than `timeout` seconds is killed and counts as a call without result.
+# The results are looked up in and added to the given RoundEliminatorCache, if any, and the latency of every server
+# process is recorded in the given Metrics, if any.
+class RoundEliminatorExecutor:
+
+    def __init__(self, workers = 1, timeout = None, server = SERVER_DIR, cache = None, metrics = None):
+        self.workers = workers
+        self.timeout = timeout
+        self.server = server
+        self.cache = cache
+        self.metrics = metrics
+        self.timeouts = 0
+        self.calls = 0
+        self._processes = set()
+        self._lock = threading.Lock()
+        self._cancelled = False
+
+    # Run the server with the given arguments as part of the given race, if any, and return its output, or an empty
+    # string if it timed out or was cancelled. A timeout is recorded in the given call state, if any.
+    def run(self, arguments, race = None, call = None):
+        if self._cancelled:
+            return ''
+        start = time.perf_counter()
+        try:
+            process = subprocess.Popen([self.server]+arguments, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        except OSError as error:
+            print("Error, could not run the round eliminator server (", error, ")")
+            return ''
+        if race is not None:
+            race.start(process)
+        with self._lock:
+            self._processes.add(process)
+            self.calls += 1
+            # cancel may have killed the running processes between the check above and now
+            if self._cancelled:
+                process.kill()
+        expired = threading.Event()
+        timer = None
+        if self.timeout is not None:
+            timer = threading.Timer(self.timeout,lambda : (expired.set(),process.kill()))
+            timer.start()
+        try:
+            with process:
+                output = read_output(process,race)
+        finally:
+            if timer is not None:
+                timer.cancel()
+            with self._lock:
+                self._processes.discard(process)
+        # The timer may fire after the end of the process or after the race was decided, that is not a timeout
+        if expired.is_set() and process.returncode != 0 and not (race is not None and race.stopped):
+            with self._lock:
+                self.timeouts += 1
+            if call is not None:
+                call["timed_out"] = True
+            self._record(arguments,start,True)
+            return ''
+        self._record(arguments,start,False)
+        return '' if self._cancelled else output
+
+    def _record(self, arguments, start, timed_out):
+        if self.metrics is not None:
+            self.metrics.record_call(arguments[0],time.perf_counter() - start,timed_out)
+
+    # Kill the running server processes, the calls that did not start yet return without running the server
+    def cancel(self):
+        self._cancelled = True
+        with self._lock:
+            for process in self._processes:
+                process.kill()
+
+    # Yield the tuples (problem, function(problem, iterations, labels)) in the order the calls complete, function being
+    # round_eliminator_ub or round_eliminator_lb. If the consumer stops (Ctrl-C, exception or break), the running
+    # server processes are killed and the pending calls dropped.
+    def map(self, function, problems, iterations, labels):
+        return self.schedule(function,partial(next,iter(problems),None),iterations,labels)
+
+    # Run function(problem, iterations, labels) and return (result, time in seconds, true if a server process timed out)
+    def _timed_call(self, function, problem, iterations, labels):
+        call = {"timed_out" : False}
+        start = time.perf_counter()
+        result = function(problem,iterations,labels,partial(self.run,call=call),self.cache)
+        return (result,time.perf_counter() - start,call["timed_out"])
+
+    # Same as map for the problems returned by next_problem, which is called whenever a worker is free and returns None
+    # when no problem is left. The consumer handles every result before the next problem is chosen, so the choice can
+    # depend on the results received so far. If record is given, record(problem, time in seconds, timed out) is called
+    # for every call before its result is yielded.
+    def schedule(self, function, next_problem, iterations, labels, record = None):
+        self._cancelled = False
+        futures = dict()
+        with ThreadPoolExecutor(self.workers) as pool:
+            try:
+                while True:
+                    while len(futures) < self.workers:
+                        problem = next_problem()
+                        if problem is None:
+                            break
+                        futures[pool.submit(self._timed_call,function,problem,iterations,labels)] = problem
+                    if not futures:
+                        break
+                    done,_ = wait(futures,return_when=FIRST_COMPLETED)
+                    for future in done:
+                        problem = futures.pop(future)
+                        result,seconds,timed_out = future.result()
+                        if record is not None:
+                            record(problem,seconds,timed_out)
+                        yield (problem,result)
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                self.cancel()
+                raise
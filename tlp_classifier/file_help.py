@@ -1,5 +1,10 @@
-import os, json
+import os, sqlite3, sys
+import numpy as np
 from .problem_set import Problem_set, problem_set_name
+from .problem import Problem
+from .complexity import Complexity
+from .relations import Relation, topological_order
+from .tools import configurations
 
 def add_degree_suffix(name, white_degree, black_degree):
     suffix = "_" + str(white_degree) + "_" + str(black_degree)
@@ -8,24 +13,169 @@ def add_degree_suffix(name, white_degree, black_degree):
 def data_name(white_degree,black_degree):
     return add_degree_suffix("data/problemSet",white_degree,black_degree)
 
-def import_data_set(white_degree, black_degree,classified):
-    problems = (set(), dict(), dict())
-    min_degree = min([white_degree,black_degree])
-    max_degree = max([white_degree,black_degree]) 
+# Return the path of the directory of the binary files of the given problem set
+def data_set_path(white_degree, black_degree, classified):
+    dir_path = os.path.dirname(os.path.realpath(__file__))
+    return os.path.join(dir_path, data_name(min(white_degree,black_degree),max(white_degree,black_degree)) + '_' + problem_set_name[classified])
 
-    curr_file_path = os.path.realpath(__file__)
-    dir_path = os.path.dirname(curr_file_path)
-    local_data_file_path = data_name(min_degree,max_degree) + '_' + problem_set_name[classified]
-    full_path = os.path.join(dir_path, local_data_file_path)
+# Return the arrays (indptr, indices) of the compressed sparse rows of the given relation over the positions of the order
+def relation_to_csr(relation, order, position):
+    indptr = np.zeros(len(order)+1,dtype=np.int64)
+    indices = []
+    for i,problem in enumerate(order):
+        others = sorted(position[other] for other in relation.covers[problem])
+        indices.extend(others)
+        indptr[i+1] = indptr[i] + len(others)
+    return (indptr,np.array(indices,dtype=np.int32))
 
-    with open(full_path, 'rb') as problem_file:
-        problems = json.load(problem_file)
-    return problems
+# A problem set stored as NumPy arrays in a directory of .npy files, loaded with memory mapping.
+# Problem i of the topological order of the restrictions has the constraints white_masks[i] and black_masks[i],
+# the bounds lower_bounds[i] and upper_bounds[i] (values of Complexity) and constant_lower_bounds[i] and
+# constant_upper_bounds[i]. The direct restrictions of problem i are the problems restrictions_indices[restrictions_indptr[i]:restrictions_indptr[i+1]]
+# and its direct relaxations are given in the same way by the relaxations arrays.
+class DataSet:
 
-# Store the given problem set in the file with the given name
-def store(white_degree,black_degree,problems,classified):
-    with open(data_name(white_degree,black_degree) + '_' + problem_set_name[classified], 'wb') as problem_file:
-        json.dump(problems, problem_file, ensure_ascii=False, indent=2)
+    ARRAYS = ['white_masks','black_masks','lower_bounds','upper_bounds','constant_lower_bounds','constant_upper_bounds',
+        'restrictions_indptr','restrictions_indices','relaxations_indptr','relaxations_indices']
+
+    # Open the data set stored in the given directory, no array is read before it is used
+    def __init__(self, path):
+        self.path = path
+        self.white_degree,self.black_degree = np.load(os.path.join(path,'degrees.npy')).tolist()
+        for name in DataSet.ARRAYS:
+            setattr(self,name,np.load(os.path.join(path,name + '.npy'),mmap_mode='r'))
+
+    def __len__(self):
+        return len(self.white_masks)
+
+    # Return the problem at the given position
+    def problem(self, i):
+        problem = Problem.from_masks(int(self.white_masks[i]),int(self.black_masks[i]),self.white_degree,self.black_degree)
+        problem.lower_bound,problem.upper_bound = Complexity(int(self.lower_bounds[i])),Complexity(int(self.upper_bounds[i]))
+        problem.constant_lower_bound,problem.constant_upper_bound = int(self.constant_lower_bounds[i]),int(self.constant_upper_bounds[i])
+        return problem
+
+    # Return the positions of the direct restrictions of the problem at the given position
+    def restrictions_of(self, i):
+        return self.restrictions_indices[self.restrictions_indptr[i]:self.restrictions_indptr[i+1]]
+
+    # Return the positions of the direct relaxations of the problem at the given position
+    def relaxations_of(self, i):
+        return self.relaxations_indices[self.relaxations_indptr[i]:self.relaxations_indptr[i+1]]
+
+    # Return the problem set as a tuple (problems, relaxations, restrictions)
+    def to_problems(self):
+        white_masks,black_masks = self.white_masks.tolist(),self.black_masks.tolist()
+        lower_bounds,upper_bounds = self.lower_bounds.tolist(),self.upper_bounds.tolist()
+        constant_lower_bounds,constant_upper_bounds = self.constant_lower_bounds.tolist(),self.constant_upper_bounds.tolist()
+        order = []
+        for i in range(len(white_masks)):
+            problem = Problem.from_masks(white_masks[i],black_masks[i],self.white_degree,self.black_degree)
+            problem.lower_bound,problem.upper_bound = Complexity(lower_bounds[i]),Complexity(upper_bounds[i])
+            problem.constant_lower_bound,problem.constant_upper_bound = constant_lower_bounds[i],constant_upper_bounds[i]
+            order.append(problem)
+        def covers(indptr, indices):
+            indptr,indices = indptr.tolist(),indices.tolist()
+            return {problem : {order[j] for j in indices[indptr[i]:indptr[i+1]]} for i,problem in enumerate(order)}
+        relaxations = covers(self.relaxations_indptr,self.relaxations_indices)
+        restrictions = covers(self.restrictions_indptr,self.restrictions_indices)
+        return (set(order),Relation(relaxations,order[::-1]),Relation(restrictions,order))
+
+# Open the given problem set stored by store, the arrays are memory mapped
+def load_data_set(white_degree, black_degree, classified, path = None):
+    return DataSet(path or data_set_path(white_degree,black_degree,classified))
+
+# Import the given problem set stored by store as a tuple (problems, relaxations, restrictions). Without a path, the
+# problem set stored by store_stream (generator -s) is imported if there is no problem set stored by store.
+def import_data_set(white_degree, black_degree, classified, path = None):
+    if path is None and not os.path.exists(data_set_path(white_degree,black_degree,classified)) and os.path.exists(sqlite_data_path(white_degree,black_degree,classified)):
+        return import_sqlite_data_set(white_degree,black_degree,classified)
+    return load_data_set(white_degree,black_degree,classified,path).to_problems()
+
+# Store the given problem set (problems, relaxations, restrictions) as a directory of .npy files
+def store(white_degree, black_degree, problems, classified, path = None):
+    path = path or data_set_path(white_degree,black_degree,classified)
+    _,relaxations,restrictions = problems
+    order = restrictions.order
+    position = {problem : i for i,problem in enumerate(order)}
+    restrictions_indptr,restrictions_indices = relation_to_csr(restrictions,order,position)
+    relaxations_indptr,relaxations_indices = relation_to_csr(relaxations,order,position)
+    arrays = {
+        'degrees' : np.array([white_degree,black_degree],dtype=np.int64),
+        'white_masks' : np.array([problem.white_mask for problem in order],dtype=np.uint64),
+        'black_masks' : np.array([problem.black_mask for problem in order],dtype=np.uint64),
+        'lower_bounds' : np.array([problem.lower_bound.value for problem in order],dtype=np.uint8),
+        'upper_bounds' : np.array([problem.upper_bound.value for problem in order],dtype=np.uint8),
+        'constant_lower_bounds' : np.array([problem.constant_lower_bound for problem in order],dtype=np.int64),
+        'constant_upper_bounds' : np.array([problem.constant_upper_bound for problem in order],dtype=np.int64),
+        'restrictions_indptr' : restrictions_indptr,
+        'restrictions_indices' : restrictions_indices,
+        'relaxations_indptr' : relaxations_indptr,
+        'relaxations_indices' : relaxations_indices
+    }
+    os.makedirs(path,exist_ok=True)
+    for name,array in arrays.items():
+        np.save(os.path.join(path,name + '.npy'),array)
+
+# Return the path of the SQLite file of the given problem set
+def sqlite_data_path(white_degree, black_degree, classified):
+    dir_path = os.path.dirname(os.path.realpath(__file__))
+    return os.path.join(dir_path, data_name(min(white_degree,black_degree),max(white_degree,black_degree)) + '_' + problem_set_name[classified] + '.sqlite')
+
+# Store the problems given by an iterable of tuples (white mask, black mask, bitmasks of the direct restrictions)
+# in a SQLite file, chunk_size problems at a time, so that the problem set never has to fit in memory.
+# The problems are identified by their key white mask << (number of black configurations) | black mask.
+def store_stream(white_degree, black_degree, problems, path = None, chunk_size = 10000):
+    path = path or sqlite_data_path(white_degree,black_degree,Problem_set.Unclassified)
+    os.makedirs(os.path.dirname(os.path.abspath(path)),exist_ok=True)
+    if os.path.exists(path):
+        os.remove(path)
+    black_bits = len(configurations(black_degree))
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE degrees (white_degree INTEGER, black_degree INTEGER)")
+    connection.execute("CREATE TABLE problems (key INTEGER PRIMARY KEY, white_mask INTEGER, black_mask INTEGER, lower_bound INTEGER, upper_bound INTEGER, constant_lower_bound INTEGER, constant_upper_bound INTEGER)")
+    connection.execute("CREATE TABLE restrictions (problem INTEGER, restriction INTEGER)")
+    connection.execute("INSERT INTO degrees VALUES (?,?)",(white_degree,black_degree))
+    number_of_problems = 0
+    rows,edges = [],[]
+    def flush():
+        connection.executemany("INSERT INTO problems VALUES (?,?,?,?,?,?,?)",rows)
+        connection.executemany("INSERT INTO restrictions VALUES (?,?)",edges)
+        connection.commit()
+        rows.clear()
+        edges.clear()
+    for white_mask,black_mask,covers in problems:
+        key = white_mask << black_bits | black_mask
+        rows.append((key,white_mask,black_mask,Complexity.Constant.value,Complexity.Unsolvable.value,0,sys.maxsize))
+        edges.extend((key,w << black_bits | b) for w,b in covers)
+        number_of_problems += 1
+        if len(rows) >= chunk_size:
+            flush()
+    flush()
+    connection.execute("CREATE INDEX restrictions_problem ON restrictions (problem)")
+    connection.execute("CREATE INDEX restrictions_restriction ON restrictions (restriction)")
+    connection.commit()
+    connection.close()
+    return number_of_problems
+
+# Import a problem set stored by store_stream as a tuple (problems, relaxations, restrictions)
+def import_sqlite_data_set(white_degree, black_degree, classified, path = None):
+    path = path or sqlite_data_path(white_degree,black_degree,classified)
+    connection = sqlite3.connect(path)
+    white_degree,black_degree = connection.execute("SELECT white_degree, black_degree FROM degrees").fetchone()
+    index = dict()
+    for key,white_mask,black_mask,lower_bound,upper_bound,constant_lower_bound,constant_upper_bound in connection.execute("SELECT * FROM problems"):
+        problem = Problem.from_masks(white_mask,black_mask,white_degree,black_degree)
+        problem.lower_bound,problem.upper_bound = Complexity(lower_bound),Complexity(upper_bound)
+        problem.constant_lower_bound,problem.constant_upper_bound = constant_lower_bound,constant_upper_bound
+        index[key] = problem
+    relaxations,restrictions = {problem : set() for problem in index.values()},{problem : set() for problem in index.values()}
+    for key,other in connection.execute("SELECT problem, restriction FROM restrictions"):
+        restrictions[index[key]].add(index[other])
+        relaxations[index[other]].add(index[key])
+    connection.close()
+    order = topological_order(index.values())
+    return (set(index.values()),Relation(relaxations,order[::-1]),Relation(restrictions,order))
 
 # Store a given set of problems in a file
 def problems_to_file(name, that):
@@ -1,59 +1,128 @@
 #!/usr/bin/python3
 import sys, getopt
-from .tools import edge_3_labelling,powerset
+from .tools import configurations,label_masks
 from .problem import Problem
-from .file_help import store
+from .file_help import store,store_stream
 from .problem_set import Problem_set
-import time
+from .canonical import is_canonical,permutation_tables,rank_tables
+from .relations import compute_relations,cover_neighbours
+from .metrics import Metrics
 from tqdm import tqdm
+from contextlib import nullcontext
+from functools import partial
+from multiprocessing import Pool
 
-def generate(white_degree, black_degree):
-    white_configurations, black_configurations = edge_3_labelling(white_degree),edge_3_labelling(black_degree)
-    white_constraints, black_constraints = powerset(white_configurations),powerset(black_configurations)
-    problems_tuple = set([(frozenset(a),frozenset(b)) for a in white_constraints for b in black_constraints])
-    problems = set([Problem(a,b,white_degree,black_degree) for (a,b) in problems_tuple if Problem(a,b,white_degree,black_degree).is_characteristic_problem()])
-    number_of_problems = len(problems)
-    problems_list = list(problems)
+# Return the white bitmasks of the given degree that come first in their orbit under the permutations of the labels
+# (in the order of the characteristic problems). The white constraint of a characteristic problem is one of them.
+def white_representatives(white_degree):
+    rank,_ = rank_tables(white_degree)
+    tables = permutation_tables(white_degree)
+    return [white_mask for white_mask in range(1 << len(configurations(white_degree))) if all(rank[table[white_mask]] >= rank[white_mask] for table in tables)]
 
-    print("Computing relaxations and restrictions ...")
+# Yield the black bitmasks of the characteristic problems with the given white constraint, which must be a white representative.
+# A reduced problem with two non-empty constraints uses the same labels in both, so the only black constraints tried
+# are made of configurations over the labels of the white constraint. Among them a black constraint is canonical when it
+# comes first in its orbit under the permutations of the labels that fix the white constraint (and the swap of the
+# constraints when the degrees are equal), so each class is produced exactly once.
+def characteristic_black_masks(white_mask, white_degree, black_degree):
+    white_labels,black_labels = label_masks(white_degree),label_masks(black_degree)
+    rank,_ = rank_tables(black_degree)
+    stabilizer = [table for table,white_table in zip(permutation_tables(black_degree),permutation_tables(white_degree)) if white_table[white_mask] == white_mask]
+    allowed = (1 << len(configurations(black_degree)))-1
+    used = [label for label in range(3) if white_mask & white_labels[label]]
+    if white_mask:
+        for label in range(3):
+            if label not in used:
+                allowed &= ~black_labels[label]
+    black_mask = allowed
+    while True:
+        if (not white_mask or not black_mask or all(black_mask & black_labels[label] for label in used)) and\
+            all(rank[table[black_mask]] >= rank[black_mask] for table in stabilizer) and\
+            (white_degree != black_degree or is_canonical(white_mask,black_mask,white_degree,black_degree)):
+            yield black_mask
+        if not black_mask:
+            return
+        black_mask = (black_mask-1) & allowed
 
-    def process_problem(elem):
-        relaxations,restrictions = set(),set()
-        equivalent_set = elem.equivalent_problems_instance()
-        for other in problems:
-            for x in equivalent_set:
-                if elem != other :
-                    if x.is_restriction(other):
-                        relaxations.add(other)
-                    if x.is_relaxation(other):
-                        restrictions.add(other)
-        return (relaxations,restrictions)
+# Return the bitmasks (white mask, black mask) of the characteristic problems with the given white constraint
+def characteristic_masks(white_mask, white_degree, black_degree):
+    return [(white_mask,black_mask) for black_mask in characteristic_black_masks(white_mask,white_degree,black_degree)]
 
-    t0= time.time()
+# Return the characteristic problems with the given white constraint as tuples (white mask, black mask, bitmasks of
+# the direct restrictions). A characteristic problem is the only reduced and canonical problem of its class.
+def characteristic_problems_with_covers(white_mask, white_degree, black_degree):
+    return [(white_mask,black_mask,cover_neighbours(white_mask,black_mask,white_degree,black_degree)) for black_mask in characteristic_black_masks(white_mask,white_degree,black_degree)]
 
-    relaxations_dict, restrictions_dict = dict(),dict()
+# Yield the characteristic problems of the given degrees as tuples (white mask, black mask, bitmasks of the direct
+# restrictions) without keeping the problem set in memory. The work is split by white constraint on the given number of
+# processes, in chunks of white constraints small enough to balance their very different sizes.
+def generate_stream(white_degree, black_degree, jobs = 1):
+    white_masks = white_representatives(white_degree)
+    function = partial(characteristic_problems_with_covers,white_degree=white_degree,black_degree=black_degree)
+    with Pool(jobs) if jobs > 1 else nullcontext() as pool:
+        shards = pool.imap(function,white_masks,chunksize=max(1,len(white_masks)//(8*jobs))) if pool else map(function,white_masks)
+        for shard in shards:
+            yield from shard
 
-    for problem in tqdm(problems):
-        a,b = process_problem(problem)
-        relaxations_dict[problem] = a
-        restrictions_dict[problem] = b
+# Return the data set (problems, relaxations, restrictions) of the characteristic problems of the given degrees.
+# Only the canonical problems are enumerated, one per class, so the time and memory depend on the number of classes.
+# The stages are measured by the given Metrics, if any.
+def generate(white_degree, black_degree, jobs = 1, metrics = None):
+    metrics = metrics or Metrics()
+    with Pool(jobs) if jobs > 1 else nullcontext() as pool:
+        # The work is split by white constraint for the problems and by chunks of problems for the relations,
+        # the results are merged in the order of the inputs so the data set does not depend on the number of jobs
+        with metrics.stage("enumeration",jobs=jobs):
+            masks = [masks for shard in (pool.imap if pool else map)(partial(characteristic_masks,white_degree=white_degree,black_degree=black_degree),white_representatives(white_degree)) for masks in shard]
+            problems = {Problem.from_masks(white_mask,black_mask,white_degree,black_degree) for white_mask,black_mask in masks}
+            metrics.count("problems",len(problems))
 
-    print(time.time()-t0)
+        print("Computing relaxations and restrictions ...")
 
-    return (set(problems),relaxations_dict,restrictions_dict)
+        with metrics.stage("relations",jobs=jobs) as record:
+            relaxations,restrictions = compute_relations(problems,partial(pool.imap,chunksize=256) if pool else map)
+            metrics.count("covers",sum(len(covers) for covers in restrictions.covers.values()))
+
+        print(record["wall_time"])
+
+    return (problems,relaxations,restrictions)
 
 def main(argv):
     white_degree = -1
     black_degree = -1
+    jobs = 1
+    stream = False
+    chunk_size = 10000
+    metrics_path = None
+    profile_dir = None
+    usage = 'generator.py -w <whitedegree> -b <blackdegree> [-j <jobs>] [-s [--chunk-size <problems>]] [--metrics <file>] [--profile <directory>]'
     try:
-        opts, args = getopt.getopt(argv,"hw:b:",["wdegree=","bdegree="])
+        opts, args = getopt.getopt(argv,"hw:b:j:s",["wdegree=","bdegree=","jobs=","stream","chunk-size=","metrics=","profile="])
     except getopt.GetoptError:
-        print ('generator.py -w <whitedegree> -b <blackdegree>')
+        print (usage)
         sys.exit(2)
     for opt, arg in opts:
         if opt == '-h':
-            print('generator.py -w <whitedegree> -b <blackdegree>')
+            print(usage)
             sys.exit()
+        elif opt == "--metrics":
+            metrics_path = arg
+        elif opt == "--profile":
+            profile_dir = arg
+        elif opt in ("-s", "--stream"):
+            stream = True
+        elif opt == "--chunk-size":
+            try :
+                chunk_size = int(arg)
+            except ValueError:
+                print("The chunk size is not an int")
+                sys.exit(1)
+        elif opt in ("-j", "--jobs"):
+            try :
+                jobs = int(arg)
+            except ValueError:
+                print("The number of jobs is not an int")
+                sys.exit(1)
         elif opt in ("-w", "--wdegree"):
             try :
                 white_degree = int(arg)
@@ -73,8 +142,17 @@ def main(argv):
         
     min_degree = min([white_degree,black_degree])
     max_degree = max([white_degree,black_degree])
-    p = generate(min_degree,max_degree)
-    store(min_degree,max_degree,p,Problem_set.Unclassified)
+    metrics = Metrics(metrics_path,profile_dir)
+    if stream:
+        with metrics.stage("stream",jobs=jobs):
+            stored = store_stream(min_degree,max_degree,tqdm(generate_stream(min_degree,max_degree,jobs)),chunk_size=chunk_size)
+            metrics.count("problems",stored)
+        print(stored,"problems stored")
+    else:
+        p = generate(min_degree,max_degree,jobs,metrics)
+        with metrics.stage("store"):
+            store(min_degree,max_degree,p,Problem_set.Unclassified)
+    metrics.close()
 
 if __name__ == "__main__":
    main(sys.argv[1:])
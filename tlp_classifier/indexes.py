@@ -0,0 +1,105 @@
+from .complexity import Complexity
+from .propagation import bounds_of
+
+# Return true if and only if the problem is unclassified
+def is_unclassified(problem):
+    return problem.get_complexity() == Complexity.Unclassified
+
+# Secondary indexes of a problem set: the problems by complexity, by lower and upper bound, and the constant problems by
+# constant lower and upper bound. They also keep the unclassified frontiers, the unclassified problems without
+# unclassified relaxations (resp. restrictions). For that every problem counts its direct relaxations (resp. restrictions)
+# that are unclassified or have an unclassified relaxation (resp. restriction), and a problem reaches the frontier when
+# this count drops to zero.
+# The indexes are kept up to date by calling update after the bounds of a problem changed, for instance as a listener
+# of a Propagator.
+class ProblemIndexes:
+
+    def __init__(self, problems, relaxations, restrictions):
+        self.relaxations = relaxations
+        self.restrictions = restrictions
+        self.by_complexity = {complexity : set() for complexity in Complexity}
+        self.by_lower_bound = {complexity : set() for complexity in Complexity}
+        self.by_upper_bound = {complexity : set() for complexity in Complexity}
+        self.by_constant_lower_bound = dict()
+        self.by_constant_upper_bound = dict()
+        for problem in problems:
+            self._add(problem)
+        self.unclassified_above,self.frontier_relaxations = self._frontier(relaxations)
+        self.unclassified_below,self.frontier_restrictions = self._frontier(restrictions)
+
+    # Return the counts of the given relation and the problems of its frontier, in one sweep over its order
+    def _frontier(self, relation):
+        counts = dict()
+        frontier = set()
+        for problem in relation.order:
+            counts[problem] = sum(1 for other in relation.covers[problem] if is_unclassified(other) or counts[other])
+            if counts[problem] == 0 and is_unclassified(problem):
+                frontier.add(problem)
+        return (counts,frontier)
+
+    def _add(self, problem):
+        complexity = problem.get_complexity()
+        self.by_complexity[complexity].add(problem)
+        self.by_lower_bound[problem.lower_bound].add(problem)
+        self.by_upper_bound[problem.upper_bound].add(problem)
+        if complexity == Complexity.Constant:
+            self.by_constant_lower_bound.setdefault(problem.constant_lower_bound,set()).add(problem)
+            self.by_constant_upper_bound.setdefault(problem.constant_upper_bound,set()).add(problem)
+
+    def _remove(self, problem, before):
+        lower_bound,upper_bound,constant_lower_bound,constant_upper_bound = before
+        complexity = lower_bound if lower_bound == upper_bound else Complexity.Unclassified
+        self.by_complexity[complexity].discard(problem)
+        self.by_lower_bound[lower_bound].discard(problem)
+        self.by_upper_bound[upper_bound].discard(problem)
+        if complexity == Complexity.Constant:
+            for index,bound in ((self.by_constant_lower_bound,constant_lower_bound),(self.by_constant_upper_bound,constant_upper_bound)):
+                index[bound].discard(problem)
+                if not index[bound]:
+                    del index[bound]
+
+    # Update the indexes after the bounds of the problem changed, before is the result of bounds_of before the change
+    def update(self, problem, before):
+        if bounds_of(problem) == before:
+            return
+        self._remove(problem,before)
+        self._add(problem)
+        lower_bound,upper_bound,_,_ = before
+        if (lower_bound != upper_bound) != is_unclassified(problem):
+            self._status_changed(problem,self.unclassified_above,self.restrictions,self.frontier_relaxations)
+            self._status_changed(problem,self.unclassified_below,self.relaxations,self.frontier_restrictions)
+
+    # Update the counts of the problems below the problem in the given direction after the problem became classified or
+    # (when contradictory bounds are set) unclassified again, a problem is followed only while its own status changes
+    def _status_changed(self, problem, counts, relation, frontier):
+        if is_unclassified(problem):
+            change = 1
+            if counts[problem] == 0:
+                frontier.add(problem)
+        else:
+            change = -1
+            frontier.discard(problem)
+        stack = [problem] if counts[problem] == 0 else []
+        while stack:
+            for other in relation.covers[stack.pop()]:
+                counts[other] += change
+                if counts[other] == (0 if change < 0 else 1):
+                    if is_unclassified(other):
+                        if change < 0:
+                            frontier.add(other)
+                        else:
+                            frontier.discard(other)
+                    else:
+                        stack.append(other)
+
+    # Return the set of the problems of the given complexity
+    def problems_of_complexity(self, complexity):
+        return set(self.by_complexity[complexity])
+
+    # Return the set of the constant problems with the given upper bound on the number of rounds
+    def constant_problems_with_upper_bound(self, rounds):
+        return set(self.by_constant_upper_bound.get(rounds,()))
+
+    # Return the distribution of the upper bounds on the number of rounds of the constant problems
+    def upper_bounds_constant_problems(self):
+        return {rounds : len(problems) for rounds,problems in self.by_constant_upper_bound.items()}
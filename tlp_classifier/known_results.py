@@ -0,0 +1,82 @@
+import os, json, glob
+from .problem import alpha_to_problem
+from .complexity import Complexity, complexity_name
+from .input import ITERATED_LOGARITHMIC_TIGHT, ITERATED_LOGARITHMIC_UPPER_BOUND, LOGARITHMIC_UPPER_BOUND, LOGARITHMIC_TIGHT, LOGARITHMIC_LOWER_BOUND
+
+# The tables of input.py with the bound they give, in the order in which they are applied
+INPUT_TABLES = [
+    (LOGARITHMIC_UPPER_BOUND,"upper bound",Complexity.Logarithmic),
+    (LOGARITHMIC_TIGHT,"tight",Complexity.Logarithmic),
+    (LOGARITHMIC_LOWER_BOUND,"lower bound",Complexity.Logarithmic),
+    (ITERATED_LOGARITHMIC_TIGHT,"tight",Complexity.Iterated_Logarithmic),
+    (ITERATED_LOGARITHMIC_UPPER_BOUND,"upper bound",Complexity.Iterated_Logarithmic)
+]
+
+# The directory of the data files of known results
+def known_results_dir():
+    return os.path.join(os.path.dirname(os.path.realpath(__file__)),'results')
+
+# Registry of the known results. Every entry is stored once under the degrees and the bitmasks of its characteristic
+# problem, so the results of a problem set are found with one dictionary lookup per entry.
+class KnownResults:
+
+    def __init__(self):
+        self.results = dict()
+
+    # Register that the problem given by the alphabetical constraints has the given bound ("upper bound", "lower bound" or "tight")
+    def add(self, white_constraint, black_constraint, bound, complexity):
+        if bound not in ("upper bound","lower bound","tight"):
+            print("Error, unknown bound " + str(bound))
+            return
+        problem = alpha_to_problem(white_constraint,black_constraint)
+        if problem is None:
+            print("Error, the known result " + str(white_constraint) + " " + str(black_constraint) + " has an empty constraint")
+            return
+        degrees = (problem.white_degree,problem.black_degree)
+        entry = self.results.setdefault(degrees,dict()).setdefault((problem.white_mask,problem.black_mask),(problem,[]))
+        entry[1].append((bound,complexity))
+
+    # Register the results of a table of input.py
+    def add_table(self, table, bound, complexity):
+        for white_constraint,black_constraint in table:
+            self.add(white_constraint,black_constraint,bound,complexity)
+
+    # Register the results of a JSON data file: a list of objects with the keys "white constraint", "black constraint"
+    # (configurations separated by commas, as in the output files), "bound" and "complexity"
+    def load(self, path):
+        names = {name : complexity for complexity,name in complexity_name.items()}
+        with open(path) as results_file:
+            for result in json.load(results_file):
+                white_constraint = {x.strip() for x in result["white constraint"].split(',')}
+                black_constraint = {x.strip() for x in result["black constraint"].split(',')}
+                if result["complexity"] not in names:
+                    print("Error, unknown complexity " + str(result["complexity"]) + " in " + path)
+                    continue
+                self.add(white_constraint,black_constraint,result["bound"],names[result["complexity"]])
+
+    # Return the entries (problem, list of (bound, complexity)) of the given degrees
+    def entries(self, white_degree, black_degree):
+        return self.results.get((min(white_degree,black_degree),max(white_degree,black_degree)),dict()).values()
+
+    # Return the list of (bound, complexity) known for the given problem
+    def lookup(self, problem):
+        return self.results.get((problem.white_degree,problem.black_degree),dict()).get((problem.white_mask,problem.black_mask),(None,[]))[1]
+
+    # Set the bounds known for the given problem
+    def apply(self, problem):
+        for bound,complexity in self.lookup(problem):
+            if bound == "upper bound":
+                problem.set_upper_bound(complexity)
+            elif bound == "lower bound":
+                problem.set_lower_bound(complexity)
+            else:
+                problem.set_complexity(complexity)
+
+# Return the registry of the tables of input.py and of the data files of the given directory
+def load_known_results(path = None):
+    registry = KnownResults()
+    for table,bound,complexity in INPUT_TABLES:
+        registry.add_table(table,bound,complexity)
+    for file_path in sorted(glob.glob(os.path.join(path or known_results_dir(),'*.json'))):
+        registry.load(file_path)
+    return registry
@@ -0,0 +1,110 @@
+import os, sys, json, time, threading, cProfile
+from contextlib import contextmanager
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Upper limits in seconds of the buckets of the latency histograms, the last bucket holds the longer calls
+LATENCY_BUCKETS = [0.01,0.1,1,10,60,600,3600]
+
+# Return the peak resident set size of the process since it started in bytes, or None if it is not available. It is not
+# reset between the stages, a stage that uses less memory than the previous ones does not lower it.
+def process_peak_rss():
+    if resource is None:
+        return None
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+
+# Return the current resident set size of the process in bytes, or None if it is not available (it is read from /proc)
+def current_rss():
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+# Metrics of a run of the generator or of the classifier: for every stage its wall time, CPU time, increase of the
+# resident set size of the process over the stage, peak resident set size of the process so far and counters, and for the round eliminator calls a latency histogram and the number of
+# timeouts per function. The counters named classified_<complexity> are gathered per stage in the summary.
+# If a path is given every stage is appended to it as a JSON line when it ends, followed by a summary line written by
+# close. If a profile directory is given every stage is profiled with cProfile and the statistics are stored as <stage>.prof.
+class Metrics:
+
+    def __init__(self, path = None, profile_dir = None):
+        self.path = path
+        self.profile_dir = profile_dir
+        self.stages = []
+        self.calls = dict()
+        self.current = None
+        self._lock = threading.Lock()
+        if path is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(path)),exist_ok=True)
+            open(path,'w').close()
+
+    def _emit(self, record):
+        if self.path is not None:
+            with open(self.path,'a') as metrics_file:
+                metrics_file.write(json.dumps(record) + '\n')
+
+    # Measure the stage run in the with block, the yielded dictionary holds the counters of the stage
+    @contextmanager
+    def stage(self, name, **parameters):
+        record = {"stage" : name, "parameters" : parameters, "counters" : dict()}
+        previous = self.current
+        self.current = record
+        profiler = cProfile.Profile() if self.profile_dir is not None else None
+        wall,cpu,rss = time.perf_counter(),time.process_time(),current_rss()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield record
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                os.makedirs(self.profile_dir,exist_ok=True)
+                profiler.dump_stats(os.path.join(self.profile_dir,name + '.prof'))
+            record["wall_time"] = time.perf_counter() - wall
+            record["cpu_time"] = time.process_time() - cpu
+            end_rss = current_rss()
+            record["rss_increase"] = end_rss - rss if rss is not None and end_rss is not None else None
+            record["process_peak_rss"] = process_peak_rss()
+            self.current = previous
+            self.stages.append(record)
+            self._emit(record)
+
+    # Add the given number to a counter of the current stage
+    def count(self, counter, number = 1):
+        if self.current is not None:
+            counters = self.current["counters"]
+            counters[counter] = counters.get(counter,0) + number
+
+    # Record a round eliminator call of the given function that took the given time
+    def record_call(self, function, seconds, timed_out = False):
+        with self._lock:
+            calls = self.calls.setdefault(function,{"calls" : 0, "timeouts" : 0, "total_time" : 0.0, "max_time" : 0.0, "histogram" : [0]*(len(LATENCY_BUCKETS)+1)})
+            calls["calls"] += 1
+            calls["timeouts"] += timed_out
+            calls["total_time"] += seconds
+            calls["max_time"] = max(calls["max_time"],seconds)
+            calls["histogram"][sum(1 for limit in LATENCY_BUCKETS if seconds > limit)] += 1
+
+    # Return the number of problems of each complexity classified by every stage that classified some
+    def classified(self):
+        prefix = "classified_"
+        classified = dict()
+        for record in self.stages:
+            counts = {name[len(prefix):] : number for name,number in record["counters"].items() if name.startswith(prefix)}
+            if counts:
+                classified[record["stage"]] = counts
+        return classified
+
+    # Return the summary of the run
+    def summary(self):
+        return {"summary" : True, "latency_buckets" : LATENCY_BUCKETS, "round_eliminator" : self.calls, "process_peak_rss" : process_peak_rss(),
+            "classified" : self.classified(),
+            "stages" : {record["stage"] : {"wall_time" : record["wall_time"], "cpu_time" : record["cpu_time"], "counters" : record["counters"]} for record in self.stages}}
+
+    # Write the summary line of the run
+    def close(self):
+        self._emit(self.summary())
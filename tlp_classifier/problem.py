@@ -1,8 +1,8 @@
 from .complexity import Complexity, complexity_name
 from enum import Enum
 import itertools
-from .algorithms import constraint_reduction
-from .tools import alpha_to_num_constraint,num_to_alpha_configuration
+from .tools import alpha_to_num_constraint,num_to_alpha_configuration,constraint_to_mask,mask_to_constraint,mask_to_configurations,label_masks,reduce_masks
+from .canonical import canonical_masks,is_canonical,equivalent_masks
 LABELS = [0,1,2]
 import sys
 
@@ -11,28 +11,66 @@ class Constraints(Enum):
     Black = 1 
 
 class Problem:
+    # Each constraint is stored as a bitmask over the configurations returned by tools.configurations(degree)
+    __slots__ = ('white_mask','black_mask','white_degree','black_degree','lower_bound','upper_bound','constant_upper_bound','constant_lower_bound','_hash')
 
     # Create a Problem
     def __init__(self, white_constraint, black_constraint, white_degree, black_degree):
-        self.white_constraint,self.black_constraint = map(lambda x : frozenset(x),constraint_reduction(frozenset(white_constraint),frozenset(black_constraint)))
+        white_mask,black_mask = reduce_masks(constraint_to_mask(white_constraint,white_degree),constraint_to_mask(black_constraint,black_degree),white_degree,black_degree)
+        self._init(white_mask,black_mask,white_degree,black_degree)
+
+    def _init(self, white_mask, black_mask, white_degree, black_degree):
+        self.white_mask = white_mask
+        self.black_mask = black_mask
         self.white_degree = white_degree
         self.black_degree = black_degree
         self.lower_bound = Complexity.Constant
         self.upper_bound = Complexity.Unsolvable
         self.constant_upper_bound = sys.maxsize
         self.constant_lower_bound = 0
+        self._hash = hash((white_mask,black_mask))
+
+    # Create a Problem from the bitmasks of its constraints, the constraints must already be reduced
+    @classmethod
+    def from_masks(cls, white_mask, black_mask, white_degree, black_degree):
+        problem = cls.__new__(cls)
+        problem._init(white_mask,black_mask,white_degree,black_degree)
+        return problem
+
+    def __getstate__(self):
+        return (self.white_mask,self.black_mask,self.white_degree,self.black_degree,self.lower_bound,self.upper_bound,self.constant_upper_bound,self.constant_lower_bound)
+
+    def __setstate__(self, state):
+        self.white_mask,self.black_mask,self.white_degree,self.black_degree,self.lower_bound,self.upper_bound,self.constant_upper_bound,self.constant_lower_bound = state
+        self._hash = hash((self.white_mask,self.black_mask))
+
+    # The set of configurations of the white constraint
+    @property
+    def white_constraint(self):
+        return mask_to_constraint(self.white_mask,self.white_degree)
+
+    # The set of configurations of the black constraint
+    @property
+    def black_constraint(self):
+        return mask_to_constraint(self.black_mask,self.black_degree)
+
+    # The configurations of the white and of the black constraint, in the order in which they are written
+    def configurations(self):
+        return (mask_to_configurations(self.white_mask,self.white_degree),mask_to_configurations(self.black_mask,self.black_degree))
+
     # The hash function for problems
     def __hash__(self):
-        return hash((self.white_constraint,self.black_constraint))
+        return self._hash
 
     # Equality of problem.
     def __eq__(self,other):
-        return (self.white_constraint == other.white_constraint and self.black_constraint == other.black_constraint)
+        return self is other or (self.white_mask == other.white_mask and self.black_mask == other.black_mask and self.white_degree == other.white_degree and self.black_degree == other.black_degree)
 
     # Print the main characteristics of the problem in the console
     def __repr__(self):
-        w = ", ".join(map(num_to_alpha_configuration,self.white_constraint))
-        b = ", ".join(map(num_to_alpha_configuration,self.black_constraint))
+        white_configurations,black_configurations = self.configurations()
+        w = ", ".join(map(num_to_alpha_configuration,white_configurations))
+        b = ", ".join(map(num_to_alpha_configuration,black_configurations))
         res = w + "\n" + b + "\n"
         if(self.get_complexity() == Complexity.Unclassified):
             return  res + "Lower bound : "+ complexity_name[self.lower_bound] + "\n" + "Upper bound : " + complexity_name[self.upper_bound] + "\n"
@@ -44,8 +82,9 @@ class Problem:
         return res
 
     def to_tuple(self):
-        w = ", ".join(map(num_to_alpha_configuration,self.white_constraint))
-        b = ", ".join(map(num_to_alpha_configuration,self.black_constraint))
+        white_configurations,black_configurations = self.configurations()
+        w = ", ".join(map(num_to_alpha_configuration,white_configurations))
+        b = ", ".join(map(num_to_alpha_configuration,black_configurations))
         if self.get_complexity() == Complexity.Unclassified:
             return {"white constraint" : w, "black constraint" : b, "complexity lower bound" : complexity_name[self.lower_bound], "complexity upper bound" : complexity_name[self.upper_bound]}
         if self.get_complexity() == Complexity.Constant:
@@ -62,8 +101,9 @@ class Problem:
         def mapping_function(configuration):
             return "A "*configuration[0]+"B "*configuration[1]+"C "*configuration[2]+"\n"
 
-        w = "".join(map(mapping_function,self.white_constraint))
-        b = "".join(map(mapping_function,self.black_constraint))
+        white_configurations,black_configurations = self.configurations()
+        w = "".join(map(mapping_function,white_configurations))
+        b = "".join(map(mapping_function,black_configurations))
         return(w,b)
 
     def re_format_white(self):
@@ -76,17 +116,15 @@ class Problem:
 
     # Return the alphabet of the given constraint
     def constraint_alphabet(self, constraint):
-        alphabet = set()
-        config = self.black_constraint if constraint == Constraints.Black else self.white_constraint
-        for elem in config:
-            for label in LABELS:
-                if elem[label] != 0:
-                    alphabet.add(label)
-        return alphabet 
+        if constraint == Constraints.Black:
+            mask,masks = self.black_mask,label_masks(self.black_degree)
+        else:
+            mask,masks = self.white_mask,label_masks(self.white_degree)
+        return {label for label in LABELS if mask & masks[label]}
 
     # Return the size of the alphabet of the given constraint
     def constraint_size(self, constraint):
-        return len(self.black_constraint if constraint == Constraints.Black else self.white_constraint)
+        return (self.black_mask if constraint == Constraints.Black else self.white_mask).bit_count()
 
     # Return the the alphabet of the problem
     def alphabet(self):
@@ -99,7 +137,7 @@ class Problem:
 
     # Check if the current problem is a restriction of the given problem
     def is_restriction(self, other):
-        return self.white_constraint.issubset(other.white_constraint) and self.black_constraint.issubset(other.black_constraint)
+        return not (self.white_mask & ~other.white_mask or self.black_mask & ~other.black_mask)
 
      # Check if the current problem is a relaxation of the given problem
     def is_relaxation(self, other):
@@ -148,21 +186,16 @@ class Problem:
 
     # Return a list of equivalents problem to the given problem
     def equivalent_problems_instance(self):
-        return [Problem(w,b,self.white_degree,self.black_degree) for w,b in self.equivalent_problems()]
+        return [Problem.from_masks(w,b,self.white_degree,self.black_degree) for w,b in equivalent_masks(self.white_mask,self.black_mask,self.white_degree,self.black_degree)]
     
     # Return the characteristic problem of the equiavalent class of problems of this problem
     def get_characteristic_problem(self):
-        equivalent_problems_list = self.equivalent_problems()
-        for white,black in equivalent_problems_list:
-            white.sort()
-            black.sort() 
-        equivalent_problems_list.sort()
-        white_c,black_c = equivalent_problems_list[0]
-        return Problem(white_c,black_c,self.white_degree,self.black_degree)
+        white_mask,black_mask = canonical_masks(self.white_mask,self.black_mask,self.white_degree,self.black_degree)
+        return Problem.from_masks(white_mask,black_mask,self.white_degree,self.black_degree)
 
     # Return true if and only if the given problem is the unique characteristic problem of all of its equivalents problems
     def is_characteristic_problem(self):
-        return self.get_characteristic_problem() == self
+        return is_canonical(self.white_mask,self.black_mask,self.white_degree,self.black_degree)
 
 # Return an instance of a problem given an problem in an alpha form
 def alpha_to_problem(white_constraint,black_constraint):
@@ -0,0 +1,96 @@
+from .complexity import Complexity
+
+# Return the bounds of the given problem
+def bounds_of(problem):
+    return (problem.lower_bound,problem.upper_bound,problem.constant_lower_bound,problem.constant_upper_bound)
+
+# Incremental propagation of the bounds over the Hasse diagrams of the relaxations and restrictions.
+# Upper bounds (and constant upper bounds) go up to the relaxations, lower bounds (and constant lower bounds) go down to
+# the restrictions, and only from the problems whose bounds changed: a problem is visited again only if one of its
+# bounds changed, so the cost depends on the region affected by the new bounds and not on the size of the data set.
+# The functions of listeners are called as listener(problem, bounds before the change) after every change of bounds.
+class Propagator:
+
+    def __init__(self, relaxations, restrictions, listeners = ()):
+        self.relaxations = relaxations
+        self.restrictions = restrictions
+        self.dirty = set()
+        self.listeners = list(listeners)
+
+    # Run function(problem) and mark the problem as changed if its bounds changed, they are pushed by propagate
+    def apply(self, function, problem):
+        before = bounds_of(problem)
+        function(problem)
+        if bounds_of(problem) != before:
+            self.dirty.add(problem)
+            self._notify(problem,before)
+
+    # Push the bounds of the problems marked as changed (and of the given problems) to their relaxations and restrictions
+    def propagate(self, problems = ()):
+        worklist = list(self.dirty)
+        worklist.extend(problems)
+        self.dirty.clear()
+        up,down = list(worklist),worklist
+        while up or down:
+            while up:
+                problem = up.pop()
+                for relax in self.relaxations.covers[problem]:
+                    before = bounds_of(relax)
+                    relax.set_upper_bound(problem.upper_bound)
+                    if problem.upper_bound == Complexity.Constant and problem.constant_upper_bound < relax.constant_upper_bound:
+                        relax.constant_upper_bound = problem.constant_upper_bound
+                    self._changed(relax,before,up,down)
+            while down:
+                problem = down.pop()
+                for restr in self.restrictions.covers[problem]:
+                    before = bounds_of(restr)
+                    if problem.lower_bound != Complexity.Constant:
+                        restr.set_lower_bound(problem.lower_bound)
+                    if problem.constant_lower_bound > restr.constant_lower_bound:
+                        restr.constant_lower_bound = problem.constant_lower_bound
+                    self._changed(restr,before,up,down)
+
+    def _notify(self, problem, before):
+        for listener in self.listeners:
+            listener(problem,before)
+
+    # Queue the problem in the directions in which its bounds changed
+    def _changed(self, problem, before, up, down):
+        lower_bound,upper_bound,constant_lower_bound,constant_upper_bound = before
+        if bounds_of(problem) != before:
+            self._notify(problem,before)
+        if problem.upper_bound != upper_bound or problem.constant_upper_bound != constant_upper_bound:
+            up.append(problem)
+        if problem.lower_bound != lower_bound or problem.constant_lower_bound != constant_lower_bound:
+            down.append(problem)
+
+    # Set an upper bound on the complexity of the problem and propagate it
+    def set_upper_bound(self, problem, complexity):
+        self.apply(lambda x : x.set_upper_bound(complexity),problem)
+        self.propagate()
+
+    # Set a lower bound on the complexity of the problem and propagate it
+    def set_lower_bound(self, problem, complexity):
+        self.apply(lambda x : x.set_lower_bound(complexity),problem)
+        self.propagate()
+
+    # Set the complexity of the problem and propagate it
+    def set_complexity(self, problem, complexity):
+        self.apply(lambda x : x.set_complexity(complexity),problem)
+        self.propagate()
+
+    # Record that the problem can be solved in the given number of rounds and propagate it
+    def set_constant_upper_bound(self, problem, rounds):
+        def function(problem):
+            problem.set_complexity(Complexity.Constant)
+            problem.constant_upper_bound = min(problem.constant_upper_bound,rounds)
+        self.apply(function,problem)
+        self.propagate()
+
+    # Record that the problem needs at least the given number of rounds and propagate it
+    def set_constant_lower_bound(self, problem, rounds):
+        def function(problem):
+            problem.set_complexity(Complexity.Constant)
+            problem.constant_lower_bound = max(problem.constant_lower_bound,rounds)
+        self.apply(function,problem)
+        self.propagate()
@@ -0,0 +1,92 @@
+import os, sqlite3, threading, hashlib, time, zlib
+from .algorithms import SERVER_DIR
+from .canonical import canonical_masks
+
+# Return the path of the default round eliminator cache file
+def default_cache_path():
+    return os.path.join(os.path.dirname(os.path.realpath(__file__)),'data','re_cache.sqlite')
+
+# Persistent cache of the outputs of the round eliminator, stored in a SQLite file.
+# An entry is identified by the characteristic problem, the function (autoub or autolb), the number of iterations,
+# the number of labels and the version of the server (the SHA-256 of the binary), so rebuilding the server
+# invalidates the previous results. When there are more than max_entries entries, the least recently used
+# ones are removed. The number of entries is kept in memory, and the last use times of the hits are written with the
+# next put or by close rather than with one commit per hit.
+class RoundEliminatorCache:
+
+    def __init__(self, path = None, max_entries = 1000000, server = SERVER_DIR):
+        self.path = path or default_cache_path()
+        self.max_entries = max_entries
+        self.server = server
+        self.hits = 0
+        self.misses = 0
+        self._version = None
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)),exist_ok=True)
+        self._connection = sqlite3.connect(self.path,check_same_thread=False)
+        self._connection.execute("CREATE TABLE IF NOT EXISTS results (white_degree INTEGER, black_degree INTEGER, white_mask INTEGER, black_mask INTEGER, function TEXT, iterations INTEGER, labels INTEGER, version TEXT, result_b BLOB, result_w BLOB, last_used REAL, PRIMARY KEY (white_degree, black_degree, white_mask, black_mask, function, iterations, labels, version))")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+        self._connection.commit()
+        self._count = self._connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        self._used = dict()
+
+    # Return the version of the server binary
+    def version(self):
+        if self._version is None:
+            try:
+                with open(self.server,'rb') as server_file:
+                    self._version = hashlib.sha256(server_file.read()).hexdigest()
+            except OSError:
+                self._version = ''
+        return self._version
+
+    def _key(self, problem, function, iterations, labels):
+        white_mask,black_mask = canonical_masks(problem.white_mask,problem.black_mask,problem.white_degree,problem.black_degree)
+        return (problem.white_degree,problem.black_degree,white_mask,black_mask,function,iterations,labels,self.version())
+
+    # Return the outputs (result_b, result_w) of the round eliminator for the given call, or None if they are not cached
+    def get(self, problem, function, iterations, labels):
+        key = self._key(problem,function,iterations,labels)
+        with self._lock:
+            row = self._connection.execute("SELECT result_b, result_w FROM results WHERE white_degree=? AND black_degree=? AND white_mask=? AND black_mask=? AND function=? AND iterations=? AND labels=? AND version=?",key).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._used[key] = time.time()
+        return tuple(zlib.decompress(result).decode() for result in row)
+
+    # Store the outputs (result_b, result_w) of the round eliminator for the given call
+    def put(self, problem, function, iterations, labels, results):
+        key = self._key(problem,function,iterations,labels)
+        result_b,result_w = (zlib.compress(result.encode()) for result in results)
+        with self._lock:
+            self._write_used()
+            if self._connection.execute("SELECT 1 FROM results WHERE white_degree=? AND black_degree=? AND white_mask=? AND black_mask=? AND function=? AND iterations=? AND labels=? AND version=?",key).fetchone() is None:
+                self._count += 1
+            self._connection.execute("INSERT OR REPLACE INTO results VALUES (?,?,?,?,?,?,?,?,?,?,?)",key+(result_b,result_w,time.time()))
+            if self._count > self.max_entries:
+                # Remove a tenth more than needed so that the eviction does not run on every insertion
+                self._count -= self._connection.execute("DELETE FROM results WHERE rowid IN (SELECT rowid FROM results ORDER BY last_used LIMIT ?)",(self._count-self.max_entries+self.max_entries//10,)).rowcount
+            self._connection.commit()
+
+    # Write the last use times of the hits since the last write, the caller commits
+    def _write_used(self):
+        if self._used:
+            self._connection.executemany("UPDATE results SET last_used=? WHERE white_degree=? AND black_degree=? AND white_mask=? AND black_mask=? AND function=? AND iterations=? AND labels=? AND version=?",[(used,)+key for key,used in self._used.items()])
+            self._used.clear()
+
+    # Return the number of entries of the cache
+    def size(self):
+        return self._count
+
+    # Return the hit and miss statistics of the cache
+    def stats(self):
+        calls = self.hits+self.misses
+        return {"hits" : self.hits, "misses" : self.misses, "hit rate" : self.hits/calls if calls else 0, "entries" : self.size()}
+
+    def close(self):
+        with self._lock:
+            self._write_used()
+            self._connection.commit()
+            self._connection.close()
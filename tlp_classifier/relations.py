@@ -0,0 +1,165 @@
+import numpy as np
+from .canonical import canonical_masks,equivalent_masks
+from .tools import reduce_masks
+
+# Return the bitmasks of the characteristic problems obtained by removing one configuration from the given problem.
+# Every restriction of the problem is one of them or one of their restrictions: removing a configuration and reducing
+# keeps every reduced sub-problem that does not use this configuration. Problems with an empty constraint are reduced
+# as they are, the ones below the given problem are reached through the two problems made of only one of its constraints.
+def lower_neighbours(white_mask, black_mask, white_degree, black_degree):
+    res = set()
+    if white_mask and black_mask:
+        res.add(canonical_masks(white_mask,0,white_degree,black_degree))
+        res.add(canonical_masks(0,black_mask,white_degree,black_degree))
+        reduce = reduce_masks
+    else:
+        reduce = lambda w,b,wd,bd: (w,b)
+    mask = white_mask
+    while mask:
+        low = mask & -mask
+        mask ^= low
+        res.add(canonical_masks(*reduce(white_mask ^ low,black_mask,white_degree,black_degree),white_degree,black_degree))
+    mask = black_mask
+    while mask:
+        low = mask & -mask
+        mask ^= low
+        res.add(canonical_masks(*reduce(white_mask,black_mask ^ low,white_degree,black_degree),white_degree,black_degree))
+    return res
+
+# Return the bitmasks of the direct restrictions of the given problem (the problems it covers in the Hasse diagram):
+# the lower neighbours that are not a restriction of another lower neighbour
+def cover_neighbours(white_mask, black_mask, white_degree, black_degree):
+    neighbours = [(w.bit_count(),b.bit_count(),w,b) for w,b in lower_neighbours(white_mask,black_mask,white_degree,black_degree)]
+    neighbours.sort(reverse=True)
+    covers = []
+    for size_w,size_b,w,b in neighbours:
+        # A restriction has at most as many configurations in each constraint (up to a swap of the constraints)
+        larger = [(other_w,other_b) for other_size_w,other_size_b,other_w,other_b in covers if
+            (size_w <= other_size_w and size_b <= other_size_b and size_w+size_b < other_size_w+other_size_b) or
+            (white_degree == black_degree and size_w <= other_size_b and size_b <= other_size_w and size_w+size_b < other_size_w+other_size_b)]
+        if not larger or not any(not (x & ~other_w or y & ~other_b) for x,y in equivalent_masks(w,b,white_degree,black_degree) for other_w,other_b in larger):
+            covers.append((size_w,size_b,w,b))
+    return {(w,b) for _,_,w,b in covers}
+
+# Return the direct restrictions of the problem given as a tuple (white mask, black mask, white degree, black degree)
+def cover_neighbours_of(problem):
+    return cover_neighbours(*problem)
+
+# Return the dictionaries (relaxations, restrictions) of the direct relaxations and restrictions of the given
+# characteristic problems (the edges of the Hasse diagram). The given set must contain every characteristic problem
+# of the degrees. The full relations are given by the transitive closure of these ones.
+# The neighbours are computed with the given map function, which can run them on a pool of processes.
+def direct_relations(problems, parallel_map = map):
+    order = topological_order(problems)
+    index = {(problem.white_mask,problem.black_mask) : problem for problem in order}
+    relaxations,restrictions = {problem : set() for problem in order},{problem : set() for problem in order}
+    neighbours = parallel_map(cover_neighbours_of,[(problem.white_mask,problem.black_mask,problem.white_degree,problem.black_degree) for problem in order])
+    for problem,problem_neighbours in zip(order,neighbours):
+        for masks in problem_neighbours:
+            other = index[masks]
+            if other != problem:
+                restrictions[problem].add(other)
+                relaxations[other].add(problem)
+    return (relaxations,restrictions)
+
+# Return the given problems ordered such that every problem comes after all of its restrictions
+def topological_order(problems):
+    return sorted(problems, key=lambda problem : (problem.white_mask.bit_count()+problem.black_mask.bit_count(),problem.white_mask,problem.black_mask))
+
+# Return the indices of the bits set in the given integer
+def bits_of(mask):
+    return np.flatnonzero(np.unpackbits(np.frombuffer(mask.to_bytes((mask.bit_length()+7)//8,'little'),dtype=np.uint8),bitorder='little'))
+
+# Return, for each problem of the order, the bitset of the positions of the problems reachable from it in the given relation
+def closure_masks(relation, order, position):
+    reachable = []
+    for problem in order:
+        mask = 0
+        for other in relation[problem]:
+            mask |= reachable[position[other]] | 1 << position[other]
+        reachable.append(mask)
+    return reachable
+
+# A relation between problems (the relaxations or the restrictions) stored as its Hasse diagram.
+# relation.covers[problem] is the set of the direct relaxations (or restrictions) of the problem and
+# relation[problem] the set of all of them, computed from a bitset closure that is built on the first request.
+# relation.order places every problem after the problems it covers, it can be used for a single sweep propagation.
+class Relation:
+
+    def __init__(self, covers, order):
+        self.covers = covers
+        self.order = order
+        self._position = None
+        self._closure = None
+
+    def __getstate__(self):
+        return (self.covers,self.order)
+
+    def __setstate__(self, state):
+        self.covers,self.order = state
+        self._position = None
+        self._closure = None
+
+    def __getitem__(self, problem):
+        return {self.order[i] for i in bits_of(self.closure_mask(problem))}
+
+    def __contains__(self, problem):
+        return problem in self.covers
+
+    def __iter__(self):
+        return iter(self.covers)
+
+    def __len__(self):
+        return len(self.covers)
+
+    def keys(self):
+        return self.covers.keys()
+
+    # Return the position of the given problem in the order, the bit of the problem in the closure bitsets
+    def position(self, problem):
+        if self._position is None:
+            self._position = {problem : i for i,problem in enumerate(self.order)}
+        return self._position[problem]
+
+    # Return the instance of the given problem stored in the relation, or None if the problem is not in the relation
+    def get(self, problem):
+        if problem not in self.covers:
+            return None
+        return self.order[self.position(problem)]
+
+    # Return the bitset of the positions of all the problems related to the given problem
+    def closure_mask(self, problem):
+        if self._closure is None:
+            self.position(problem)
+            self._closure = closure_masks(self.covers,self.order,self._position)
+        return self._closure[self.position(problem)]
+
+    # Iterate over all the problems related to the given problem without building the closure
+    def reachable(self, problem):
+        seen = {problem}
+        stack = [problem]
+        while stack:
+            for other in self.covers[stack.pop()]:
+                if other not in seen:
+                    seen.add(other)
+                    stack.append(other)
+                    yield other
+
+    # Return the inverse relation (the restrictions of the relaxations and conversely)
+    def inverse(self):
+        covers = {problem : set() for problem in self.covers}
+        for problem,others in self.covers.items():
+            for other in others:
+                covers[other].add(problem)
+        return Relation(covers,self.order[::-1])
+
+    # Return the number of cover edges of the relation
+    def size(self):
+        return sum(map(len,self.covers.values()))
+
+# Return the relations (relaxations, restrictions) of the given characteristic problems stored as Hasse diagrams.
+# The given set must contain every characteristic problem of the degrees.
+def compute_relations(problems, parallel_map = map):
+    relaxations,restrictions = direct_relations(problems,parallel_map)
+    order = topological_order(problems)
+    return (Relation(relaxations,order[::-1]),Relation(restrictions,order))
@@ -0,0 +1,111 @@
+import heapq, time
+
+# Return, for each of the given candidates, the bitset of the indices (in the list of the candidates) of the candidates
+# reachable from it in the given relation, computed in one sweep over the order of the relation
+def candidate_closures(relation, candidates):
+    index = {problem : i for i,problem in enumerate(candidates)}
+    reachable = dict()
+    for problem in relation.order:
+        mask = 0
+        for other in relation.covers[problem]:
+            mask |= reachable[other]
+            if other in index:
+                mask |= 1 << index[other]
+        reachable[problem] = mask
+    return [reachable[problem] for problem in candidates]
+
+# Order of the round eliminator calls of a pass. A bound found for a problem also holds for the problems related to it
+# in the given relation (the relaxations for an upper bound, the restrictions for a lower bound), so the next problem is
+# the pending one with the most pending candidates among them, ties broken by the order of the relation.
+# The scheduler is updated after every change of bounds (as a listener of a Propagator): a pending problem that no longer
+# satisfies is_candidate is dropped, it got a bound from the answers already received.
+# The problems with a cost (the time of their calls that timed out with cheaper settings, given by an EscalationPolicy)
+# are queried after the others, from the cheapest.
+class ImplicationScheduler:
+
+    def __init__(self, relation, candidates, is_candidate, cost = None):
+        self.is_candidate = is_candidate
+        self.candidates = sorted(candidates, key=relation.position)
+        self.index = {problem : i for i,problem in enumerate(self.candidates)}
+        self.costs = [cost(problem) if cost else 0 for problem in self.candidates]
+        self.closures = candidate_closures(relation,self.candidates)
+        self.pending = (1 << len(self.candidates)) - 1
+        self.dropped = []
+        for problem in self.candidates:
+            self.update(problem)
+        self._heap = [self.key(i) for i in range(len(self.candidates))]
+        heapq.heapify(self._heap)
+
+    # Return the number of pending candidates whose bound would follow from the bound of the i-th candidate
+    def priority(self, i):
+        return (self.pending & self.closures[i]).bit_count()
+
+    # Return the key of the i-th candidate in the heap, the keys only increase
+    def key(self, i):
+        return (self.costs[i],-self.priority(i),i)
+
+    # Drop the problem if it is pending and no longer a candidate
+    def update(self, problem, before = None):
+        i = self.index.get(problem)
+        if i is not None and self.pending >> i & 1 and not self.is_candidate(problem):
+            self.pending &= ~(1 << i)
+            self.dropped.append(problem)
+
+    # Return the next problem to query, or None if no problem is pending. The keys only increase, so a problem whose
+    # recomputed key still comes before the stale key at the top of the heap comes before all the others.
+    def next(self):
+        while self._heap:
+            i = heapq.heappop(self._heap)[-1]
+            if not self.pending >> i & 1:
+                continue
+            key = self.key(i)
+            if self._heap and key > self._heap[0]:
+                heapq.heappush(self._heap,key)
+                continue
+            self.pending &= ~(1 << i)
+            return self.candidates[i]
+        return None
+
+# Escalation of the settings (iterations, labels) of the round eliminator passes of one kind. The settings are run from
+# the cheapest (fewest labels, then fewest iterations) to the costliest, each one on the candidates still open after the
+# previous ones. The cost of every call is recorded per problem: a problem whose call was stopped by the timeout is still
+# run with the costlier settings, but after the problems that did not time out, so that the budget goes to the likely
+# answers first. A pass stops querying new problems once it ran for budget seconds, the problems it did not query are
+# left to the next settings.
+class EscalationPolicy:
+
+    def __init__(self, settings, budget = None):
+        self.settings = sorted(settings, key=lambda setting : (setting[1],setting[0]))
+        self.budget = budget
+        self.costs = dict()
+        self.summary = {setting : {"candidates" : 0, "calls" : 0, "timeouts" : 0, "time" : 0.0, "resolved" : 0} for setting in self.settings}
+        self._start = None
+
+    # Return the time spent by the calls on the problem that timed out, 0 if none did
+    def cost(self, problem):
+        return sum(seconds for _,seconds,timed_out in self.costs.get(problem,()) if timed_out)
+
+    # Record that calls on the problem timed out after the given time with settings run before, as saved by a checkpoint
+    def restore(self, problem, seconds):
+        self.costs.setdefault(problem,[]).append((None,seconds,True))
+
+    # Start the pass of the given setting on the given number of candidates, the time budget starts now
+    def start(self, setting, candidates):
+        self.summary[setting]["candidates"] += candidates
+        self._start = time.perf_counter()
+
+    # Return true if and only if the time budget of the current pass is spent
+    def out_of_budget(self):
+        return self.budget is not None and time.perf_counter() - self._start >= self.budget
+
+    # Record a call of the given setting on the problem that took the given time
+    def record(self, setting, problem, seconds, timed_out):
+        self.costs.setdefault(problem,[]).append((setting,seconds,timed_out))
+        summary = self.summary[setting]
+        summary["calls"] += 1
+        summary["timeouts"] += timed_out
+        summary["time"] += seconds
+
+    # Record that the pass of the given setting resolved the given number of candidates
+    def resolved(self, setting, number):
+        self.summary[setting]["resolved"] += number
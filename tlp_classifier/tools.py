@@ -1,4 +1,5 @@
 import itertools
+from functools import lru_cache
 
 # Return the list of possible 3-labellings of node with a given degre
 def edge_3_labelling(degree):
@@ -18,4 +19,60 @@ def alpha_to_num_configuration(alpha_configuration):
 
 # Transform a set of configurations from a alpha form to a numerical form
 def alpha_to_num_constraint( alpha_constraint):
-    return [alpha_to_num_configuration(x) for x in alpha_constraint]
\ No newline at end of file
+    return [alpha_to_num_configuration(x) for x in alpha_constraint]
+
+# Return the configurations of the given degree, the position of a configuration is its index in a constraint bitmask
+@lru_cache(maxsize=None)
+def configurations(degree):
+    return tuple(edge_3_labelling(degree))
+
+# Return a dictionary giving the index of each configuration of the given degree
+@lru_cache(maxsize=None)
+def configuration_index(degree):
+    return {configuration : i for i,configuration in enumerate(configurations(degree))}
+
+# Return, for each label, the bitmask of the configurations of the given degree that use this label
+@lru_cache(maxsize=None)
+def label_masks(degree):
+    return tuple(sum(1 << i for i,configuration in enumerate(configurations(degree)) if configuration[label] != 0) for label in range(3))
+
+# Return the bitmasks of the reduced form of the constraints given by their bitmasks: the configurations using a label
+# that appears in only one of the constraints are removed until every label appears in both constraints or in none.
+# Same result as algorithms.constraint_reduction.
+def mask_reduction(white_mask, black_mask, white_degree, black_degree):
+    white_labels,black_labels = label_masks(white_degree),label_masks(black_degree)
+    while white_mask and black_mask:
+        removed_white,removed_black = 0,0
+        for label in range(3):
+            if (white_mask & white_labels[label] == 0) != (black_mask & black_labels[label] == 0):
+                removed_white |= white_labels[label]
+                removed_black |= black_labels[label]
+        if not removed_white:
+            break
+        white_mask &= ~removed_white
+        black_mask &= ~removed_black
+    return (white_mask,black_mask)
+
+# Memoized mask_reduction, for the constraints that are reduced many times (problem creation, neighbours of the problems)
+@lru_cache(maxsize=1 << 16)
+def reduce_masks(white_mask, black_mask, white_degree, black_degree):
+    return mask_reduction(white_mask,black_mask,white_degree,black_degree)
+
+# Transform a set of configurations from a numerical form to a bitmask
+def constraint_to_mask(constraint, degree):
+    index = configuration_index(degree)
+    mask = 0
+    for configuration in constraint:
+        mask |= 1 << index[configuration]
+    return mask
+
+# Transform a bitmask to the tuple of the configurations it represents, in the order of configurations(degree). This is
+# the order in which the configurations of a constraint are written in the outputs.
+@lru_cache(maxsize=None)
+def mask_to_configurations(mask, degree):
+    return tuple(configuration for i,configuration in enumerate(configurations(degree)) if mask >> i & 1)
+
+# Transform a bitmask to the set of configurations from a numerical form it represents
+@lru_cache(maxsize=None)
+def mask_to_constraint(mask, degree):
+    return frozenset(mask_to_configurations(mask,degree))
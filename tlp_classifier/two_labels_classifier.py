@@ -1,5 +1,8 @@
 from bitarray import bitarray,util
+import numpy as np
+from functools import lru_cache
 from .complexity import Complexity
+from .tools import configurations
 
 def is_unsolvable(white_constraint,black_constraint,white_degree,black_degree):
     #I.a, I.c
@@ -64,3 +67,49 @@ def constraints_to_bitvector_tuple(white_constraint,black_constraint,alphabet,wh
     for configuration in black_constraint:
         black[configuration[label]] = 1
     return (white,black)
+
+# Batch version of get_complexity_of. A binary labelling problem is given by the integer bit patterns (white, black)
+# where bit k is set if and only if the configurations with k times the first label are allowed (bit k of the pattern
+# is item k of the bitarray). Return the array of the values of the complexities of the problems given by the arrays
+# of patterns, evaluating the rules I to VI on all of them at once.
+def get_complexities(white_patterns, black_patterns, white_degree, black_degree):
+    assert(white_degree>=2 and black_degree>=2)
+    white,black = np.asarray(white_patterns,dtype=np.int64),np.asarray(black_patterns,dtype=np.int64)
+    def bit(pattern, k):
+        return (pattern >> k) & 1 == 1
+    def unsolvable(white, black, white_degree, black_degree):
+        #I.a, I.c / I.b, I.d / II.a, II.b
+        return ((white == 1) & ~bit(black,0)) | ((white == 1 << white_degree) & ~bit(black,black_degree)) | (white == 0)
+    def global_(white, black, white_degree, black_degree):
+        middle = ((1 << white_degree+1)-1) ^ 1 ^ (1 << white_degree)
+        #V.a, V.b
+        res = bit(white,0) & bit(white,white_degree) & (white & middle == 0) & (black == 2) if black_degree == 2 else np.zeros(len(white),dtype=bool)
+        #VI.a VI.b
+        return res | ((white & ((1 << white_degree-1)-1) == 0) & bit(white,white_degree-1) & bit(black,1) & (black >> 2 == 0))
+    full_white,full_black = (1 << white_degree+1)-1,(1 << black_degree+1)-1
+    #III.a, III.b / IV.a / IV.b
+    constant = ((white == full_white) & (black != 0)) | ((black == full_black) & (white != 0)) | (bit(white,0) & bit(black,0)) | (bit(white,white_degree) & bit(black,black_degree))
+    return np.select(
+        [unsolvable(white,black,white_degree,black_degree) | unsolvable(black,white,black_degree,white_degree),
+        constant,
+        global_(white,black,white_degree,black_degree) | global_(black,white,black_degree,white_degree)],
+        [Complexity.Unsolvable.value,Complexity.Constant.value,Complexity.Global.value],
+        Complexity.Logarithmic.value)
+
+# Return the array giving, for each label and each configuration of the given degree, the bit of the configuration in a bit pattern
+@lru_cache(maxsize=None)
+def pattern_bits(degree):
+    return np.array([[1 << configuration[label] for configuration in configurations(degree)] for label in range(3)],dtype=np.int64)
+
+# Return the array of the bit patterns of the constraints given by an array of bitmasks, each one counting the label
+# given by the array of labels. The constraints must only use the given label and one other label.
+def masks_to_patterns(masks, labels, degree):
+    bits = pattern_bits(degree)
+    number_of_configurations = bits.shape[1]
+    masks = np.array(masks,dtype=np.uint64 if number_of_configurations <= 64 else object)
+    labels = np.asarray(labels,dtype=np.int64)
+    patterns = np.zeros(len(masks),dtype=np.int64)
+    for i in range(number_of_configurations):
+        allowed = (masks >> (np.uint64(i) if masks.dtype == np.uint64 else i)) & 1 == 1
+        patterns |= np.where(allowed,bits[labels,i],0)
+    return patterns